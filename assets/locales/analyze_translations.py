@@ -10,25 +10,20 @@ Analyzes all language files to identify missing translation keys compared to Eng
 
 import json
 import os
+import sys
 from typing import Dict, Any
 from collections import defaultdict
 
-def flatten_dict(d: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
-    """Flatten a nested dictionary into dot-notation keys."""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-def load_json_file(file_path: str) -> Dict[str, Any]:
-    """Load and parse a JSON file."""
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts")
+)
+import i18n_corpus  # noqa: E402  (path set up above)
+
+def load_flat_file(file_path: str) -> Dict[str, Any]:
+    """Load a JSON file as dot-notation keys, without building the nested tree."""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            return dict(i18n_corpus.iter_pairs(f.read(), strings_only=False))
     except Exception as e:
         print(f"Error loading {file_path}: {e}")
         return {}
@@ -38,8 +33,7 @@ def main():
 
     # Load English reference
     en_path = os.path.join(locales_dir, "en.json")
-    en_data = load_json_file(en_path)
-    en_flat = flatten_dict(en_data)
+    en_flat = load_flat_file(en_path)
     en_keys = set(en_flat.keys())
 
     print(f"English reference has {len(en_keys)} keys")
@@ -59,8 +53,7 @@ def main():
             print(f"Warning: {lang_file} does not exist")
             continue
 
-        lang_data = load_json_file(lang_path)
-        lang_flat = flatten_dict(lang_data)
+        lang_flat = load_flat_file(lang_path)
         lang_keys = set(lang_flat.keys())
 
         missing_keys = en_keys - lang_keys
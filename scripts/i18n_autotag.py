@@ -43,9 +43,18 @@ Constraints:
   - Preserves source formatting via surgical in-place attribute insertion
     keyed off BeautifulSoup's ``sourceline`` / ``sourcepos``; never calls
     ``soup.prettify()`` or ``str(soup)`` on the whole document.
+
+Re-runs are incremental: ``.i18n-cache/autotag.json`` records each page's
+sha256 as this script last left it, and a page whose bytes still match is
+not parsed again -- tagging depends on nothing but the page itself (and this
+script, whose hash invalidates the manifest).  ``--full`` ignores it.
+``--jobs N`` tags pages in N worker processes; results are merged in path
+order, so key IDs and the seeded locale order match a serial run exactly.
 """
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import re
 import sys
@@ -53,8 +62,16 @@ from pathlib import Path
 
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+import i18n_html_index as html_index  # noqa: E402
+import i18n_locale_store as locale_store  # noqa: E402
+import i18n_profile as profiling  # noqa: E402
+
 REPO_ROOT = Path(__file__).resolve().parent.parent
 LOCALES_DIR = REPO_ROOT / "assets" / "locales"
+MANIFEST = corpus.CACHE_DIR / "autotag.json"
 
 TAGGABLE = {
     "h1", "h2", "h3", "h4", "h5", "h6",
@@ -165,31 +182,43 @@ def inner_html_collapsed(raw: str, start: int, end: int) -> str:
     return collapse_ws(raw[start:end])
 
 
-def find_open_tag_end(raw: str, line: int, col: int) -> tuple[int, int, str, str] | None:
+def line_starts(raw: str) -> list[int]:
+    """Offset of the first character of every line (``\n``-separated).
+
+    Built once per file so each (line, col) lookup is an index, not a scan
+    from the top of the file -- which made tagging a page quadratic.
+    """
+    starts = [0]
+    find = raw.find
+    pos = find("\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = find("\n", pos + 1)
+    return starts
+
+
+def find_open_tag_end(
+    raw: str, line: int, col: int, starts: list[int] | None = None
+) -> tuple[int, int, str, str] | None:
     """Locate the open tag at (line, col) in raw text.
 
     Returns (start_offset, end_offset, tagname, attrs_text) or None if
     the tag could not be located (e.g. position is bogus, or the tag is
     self-closing in a way we can't handle).
 
-    ``col`` is 0-based per BS4's sourcepos.
+    ``col`` is 0-based per BS4's sourcepos.  Pass ``starts`` (``line_starts``
+    of ``raw``) when locating many tags in one file.
     """
-    # Convert (line, col) into a byte offset.  Lines are 1-based.
-    lines_seen = 0
-    offset = 0
-    for i, ch in enumerate(raw):
-        if lines_seen == line - 1:
-            offset = i + col
-            break
-        if ch == "\n":
-            lines_seen += 1
+    # Convert (line, col) into an offset.  Lines are 1-based.
+    if starts is None:
+        starts = line_starts(raw)
+    if line == 1:
+        offset = col
+    elif 1 < line <= len(starts) and starts[line - 1] < len(raw):
+        offset = starts[line - 1] + col
     else:
-        # Either we never found line-1 newlines (file is shorter than
-        # expected) or the start is on line 1.
-        if line == 1:
-            offset = col
-        else:
-            return None
+        # The file is shorter than that (or the line is bogus).
+        return None
 
     if offset >= len(raw) or raw[offset] != "<":
         # BS4 sometimes reports sourcepos pointing just past the ``<``.
@@ -204,33 +233,6 @@ def find_open_tag_end(raw: str, line: int, col: int) -> tuple[int, int, str, str
     return offset, m.end(), m.group(1).lower(), m.group(2)
 
 
-def matching_close_offset(raw: str, open_end: int, tagname: str) -> int | None:
-    """Find the offset of the matching </tagname> for the open tag.
-
-    Uses naive depth counting on the raw string after ``open_end``.  This
-    is good enough for well-formed HTML.  Skips nested same-name tags.
-    """
-    pattern = re.compile(
-        r"<\s*(/?)\s*" + re.escape(tagname) + r"(\s|>|/)",
-        re.IGNORECASE,
-    )
-    depth = 1
-    pos = open_end
-    while pos < len(raw):
-        m = pattern.search(raw, pos)
-        if not m:
-            return None
-        is_close = m.group(1) == "/"
-        if is_close:
-            depth -= 1
-            if depth == 0:
-                return m.start()
-        else:
-            depth += 1
-        pos = m.end()
-    return None
-
-
 def process_file(
     html_path: Path,
     en_translations: dict[str, str],
@@ -241,6 +243,7 @@ def process_file(
     """
     raw = html_path.read_text(encoding="utf-8")
     soup = BeautifulSoup(raw, "html.parser")
+    starts = line_starts(raw)
 
     key_prefix = relpath_to_key_prefix(html_path)
     # Stable counter: scan existing data-i18n keys that follow our shape
@@ -294,7 +297,7 @@ def process_file(
         if tag.sourceline is None or tag.sourcepos is None:
             skipped += 1
             continue
-        located = find_open_tag_end(raw, tag.sourceline, tag.sourcepos)
+        located = find_open_tag_end(raw, tag.sourceline, tag.sourcepos, starts)
         if located is None:
             skipped += 1
             continue
@@ -337,78 +340,81 @@ def process_file(
     return added, skipped
 
 
-def load_locale(lang: str) -> dict:
-    return json.loads((LOCALES_DIR / f"{lang}.json").read_text(encoding="utf-8"))
+def tag_page(html_path: Path) -> tuple[int, int, dict[str, str], str]:
+    """``process_file`` for one page, as a self-contained unit of work.
 
+    Returns (added, skipped, that page's new {key: English}, sha256 of the
+    page as left on disk) -- everything ``main`` needs, so a worker process
+    can run it.
+    """
+    translations: dict[str, str] = {}
+    added, skipped = process_file(html_path, translations)
+    sha = hashlib.sha256(html_path.read_bytes()).hexdigest()
+    return added, skipped, translations, sha
 
-def write_locale(lang: str, data: dict) -> None:
-    (LOCALES_DIR / f"{lang}.json").write_text(
-        json.dumps(data, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
 
+def load_manifest(rev: str) -> dict[str, str]:
+    """{repo-relative page: sha256 when last tagged}, if written by ``rev``."""
+    try:
+        data = json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("pages", {}) if data.get("revision") == rev else {}
 
-def insert_dotted(target: dict, dotted_key: str, value) -> bool:
-    """Insert value at dotted key path.  Returns True if a new leaf was
-    written; False if a leaf was already present (no overwrite) or if
-    insertion would clobber a non-dict ancestor.
 
-    NB: refuses to promote an existing string leaf into a dict — that
-    would silently lose the original value.  Auto-tagged keys all live
-    under the dedicated ``docs.auto.*`` namespace specifically to avoid
-    such collisions.
-    """
-    parts = dotted_key.split(".")
-    for i, part in enumerate(parts[:-1]):
-        node = target.get(part)
-        if node is None:
-            target[part] = {}
-        elif not isinstance(node, dict):
-            # Refuse to clobber a non-dict leaf.  Caller should pick a
-            # different key path.
-            sys.stderr.write(
-                f"WARN: refusing to promote leaf at "
-                f"{'.'.join(parts[:i+1])!r} into a dict (would lose value "
-                f"{node!r}); skipping {dotted_key!r}\n"
-            )
-            return False
-        target = target[part]
-    leaf = parts[-1]
-    if leaf in target and not isinstance(target[leaf], dict):
-        return False
-    if leaf in target and isinstance(target[leaf], dict):
-        # Existing subtree at the leaf position — can't write a string.
-        sys.stderr.write(
-            f"WARN: leaf position {dotted_key!r} already holds a subtree; "
-            f"skipping\n"
-        )
-        return False
-    target[leaf] = value
-    return True
+def save_manifest(rev: str, pages: dict[str, str]) -> None:
+    payload = {"revision": rev, "pages": dict(sorted(pages.items()))}
+    corpus.atomic_write(MANIFEST, json.dumps(payload, indent=1).encode("utf-8"))
 
 
 def seed_locales(en_translations: dict[str, str]) -> dict[str, int]:
     """Seed all 14 locale files with the new keys.
 
     Returns per-locale count of newly-seeded keys.
+
+    Keys a locale already holds are left alone.  Auto-tagged keys all live
+    under the dedicated ``docs.auto.*`` namespace, so a key that would turn
+    an existing leaf into a subtree (or the reverse) is a collision the store
+    refuses with a warning rather than lose a value.
     """
     counts: dict[str, int] = {}
+    store = locale_store.LocaleStore()
     for lang in LOCALES:
-        data = load_locale(lang)
+        path = LOCALES_DIR / f"{lang}.json"
+        have = store.view(path)
         added = 0
         for key, en_text in en_translations.items():
+            if key in have:
+                continue
             if lang == "en":
                 value = en_text
             else:
                 value = f"[TODO] {en_text}"
-            if insert_dotted(data, key, value):
+            if store.set(path, key, value):
                 added += 1
-        write_locale(lang, data)
         counts[lang] = added
+    store.commit()
     return counts
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="re-parse every page, ignoring the unchanged-page manifest",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="tag pages in N worker processes (0 = one per CPU)",
+    )
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+    profiling.start("i18n_autotag", args.profile)
+    profiling.instrument(sys.modules[__name__], "load_manifest", prefix="autotag.")
+
     html_files = sorted(
         p for p in REPO_ROOT.rglob("*.html")
         if "node_modules" not in p.parts
@@ -416,12 +422,33 @@ def main() -> int:
     )
     print(f"Found {len(html_files)} HTML files", file=sys.stderr)
 
+    rev = corpus.revision(Path(__file__).resolve())
+    done = {} if args.full or not corpus.cache_enabled() else load_manifest(rev)
+    pages: dict[str, str] = {}
+    todo = []
+    with profiling.phase("autotag.unchanged_scan", items=len(html_files)):
+        for path in html_files:
+            rel = path.relative_to(REPO_ROOT).as_posix()
+            if done.get(rel) == hashlib.sha256(path.read_bytes()).hexdigest():
+                pages[rel] = done[rel]  # unchanged since it was last tagged
+            else:
+                todo.append(path)
+    profiling.count("autotag.pages", len(html_files))
+    profiling.count("autotag.pages_to_tag", len(todo))
+    if len(todo) < len(html_files):
+        print(f"  {len(html_files) - len(todo)} unchanged since last run",
+              file=sys.stderr)
+
     en_translations: dict[str, str] = {}
     total_added = 0
     total_skipped = 0
     files_modified = 0
-    for path in html_files:
-        added, skipped = process_file(path, en_translations)
+    # Results come back in ``todo`` (path) order whichever worker finishes
+    # first, so en_translations is ordered exactly as a serial run's.
+    results = corpus.map_sharded(tag_page, [(p,) for p in todo], args.jobs)
+    for path, (added, skipped, translations, sha) in zip(todo, results):
+        en_translations.update(translations)
+        pages[path.relative_to(REPO_ROOT).as_posix()] = sha
         total_added += added
         total_skipped += skipped
         if added:
@@ -433,17 +460,30 @@ def main() -> int:
         f"({total_skipped} candidates skipped)",
         file=sys.stderr,
     )
+    profiling.count("autotag.elements_tagged", total_added)
+    if files_modified:
+        # Re-index just the rewritten pages now, so the gates that read the
+        # shared HTML index (i18n_validate, seed_missing_i18n) start warm.
+        with profiling.phase("autotag.html_index"):
+            html_index.load(REPO_ROOT)
 
     if not en_translations:
         print("No new keys to seed.", file=sys.stderr)
+        if corpus.cache_enabled():
+            save_manifest(rev, pages)
         return 0
 
     print(f"\nSeeding {len(en_translations)} new keys into 14 locales...",
           file=sys.stderr)
-    counts = seed_locales(en_translations)
+    with profiling.phase("autotag.seed", items=len(en_translations)):
+        counts = seed_locales(en_translations)
     for lang in LOCALES:
         print(f"  {lang}: +{counts[lang]}", file=sys.stderr)
 
+    # Only once the keys are in the locales: a run that died before seeding
+    # must not have its pages remembered as done.
+    if corpus.cache_enabled():
+        save_manifest(rev, pages)
     return 0
 
 
@@ -63,6 +63,8 @@ Usage:
   python3 scripts/i18n_check_markup.py --prune    # drop entries that are now clean
   python3 scripts/i18n_check_markup.py --requeue  # re-mark violations for translation
   python3 scripts/i18n_check_markup.py --limit 40 # how many to print
+  python3 scripts/i18n_check_markup.py --jobs 8   # locales in 8 worker processes
+  python3 scripts/i18n_check_markup.py --incremental  # re-check only changed values
 """
 
 import argparse
@@ -79,6 +81,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parent))
 # the table is what keeps this file identical everywhere -- and means a new
 # surface is declared in exactly one place.
 import i18n_strict as strict  # noqa: E402  (path set up above)
+import i18n_corpus as corpus  # noqa: E402
+import i18n_profile as profiling  # noqa: E402
 
 REPO = Path(__file__).resolve().parent.parent
 BASELINE_PATH = REPO / ".i18n-markup-baseline.json"
@@ -103,8 +107,140 @@ def signature(value: str) -> Counter:
     return sig
 
 
-def gather():
-    """(surface, lang, path, key, english, en_sig, loc_sig) per mismatch."""
+class TaggedEnglish:
+    """The English keys that carry markup, in English order, with their
+    signatures.
+
+    Only those keys can fail this gate, and they are a small share of the
+    corpus, so a locale is checked by looking up just their values instead
+    of searching every value for a tag and re-deriving the English signature
+    once per locale.  Kept under ``.i18n-cache/markup/`` keyed by a digest of
+    the English file and this script, so an unchanged English is never
+    rescanned at all.
+    """
+
+    def __init__(self, en_path):
+        en_path = Path(en_path)
+        # The journal too: under I18N_DEFER_WRITES English may differ from
+        # the file on disk.
+        self.revision = corpus.revision(
+            en_path, Path(__file__), str(corpus.journal_stamp())
+        )
+        self._cache = (
+            corpus.CACHE_DIR
+            / "markup"
+            / f"{en_path.stem}-{corpus.input_digest(str(en_path.resolve()))}.json"
+        )
+        loaded = self._load()
+        if loaded is None:
+            english = corpus.flat(en_path)
+            self.keys = [key for key, value in english.items() if _TAG.search(value)]
+            self.sigs = [signature(english[key]) for key in self.keys]
+            self._save()
+        else:
+            self.keys, self.sigs = loaded
+
+    def _load(self):
+        if not corpus.cache_enabled():
+            return None
+        try:
+            data = json.loads(self._cache.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("revision") != self.revision:
+            return None
+        return data["keys"], [Counter(sig) for sig in data["sigs"]]
+
+    def _save(self):
+        if not corpus.cache_enabled():
+            return
+        payload = {"revision": self.revision, "keys": self.keys, "sigs": self.sigs}
+        corpus.atomic_write(
+            self._cache,
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        )
+
+
+# en_path -> (corpus.flat of English it was built for, TaggedEnglish).
+_TAGGED = {}
+
+
+def tagged_english(en_path):
+    """``TaggedEnglish`` of ``en_path``, once per process while it is unchanged."""
+    english = corpus.flat(en_path)
+    hit = _TAGGED.get(en_path)
+    if hit is None or hit[0] is not english:
+        hit = _TAGGED[en_path] = (english, TaggedEnglish(en_path))
+    return hit[1]
+
+
+# The VerdictCache entry holding a whole locale's result; no key starts with a
+# NUL.
+_WHOLE_FILE = "\x00file"
+
+
+def verdict_revision():
+    """What besides the two values decides a cached verdict: this script."""
+    return corpus.revision(Path(__file__))
+
+
+def gather_locale(en_path, path, cache_name=None, rev=None):
+    """Keys of one locale whose markup differs from English, in English order.
+
+    The unit of work ``--jobs`` hands to a worker: paths in, bare keys out.
+    Only mismatches are rare, so the caller rebuilds their signatures itself
+    instead of shipping a Counter per key back across the process boundary.
+    With ``rev`` (``--incremental``) a key whose English and translation are
+    unchanged since the last run reuses that run's verdict, cached as
+    ``cache_name``; if neither file's content changed at all, the locale is
+    hashed but not parsed.
+    """
+    tagged = tagged_english(en_path)
+    cache = whole = None
+    if rev is not None:
+        cache = corpus.VerdictCache(cache_name, rev)
+        # The file's content hash, not its stat: an edit that kept the
+        # mtime and size must not reuse the last result.
+        whole = corpus.input_digest(tagged.revision, corpus.content_digest(path))
+        found = cache.get(_WHOLE_FILE, whole)
+        if found is not None:
+            profiling.count("markup.locales_unchanged")
+            return found
+    english, values = corpus.flat(en_path), corpus.flat(path)
+    todo = strict.TODO.strip()
+    found = []
+    for key, en_sig in zip(tagged.keys, tagged.sigs):
+        value = values.get(key)
+        # A gap is translate-check's problem, not ours; reporting it
+        # here would name the same string under two different faults.
+        if not isinstance(value, str) or value.startswith(todo):
+            continue
+        if cache is None:
+            differs = en_sig != signature(value)
+        else:
+            inputs = corpus.input_digest(english[key], value)
+            differs = cache.get(key, inputs)
+            if differs is None:
+                differs = en_sig != signature(value)
+                cache.put(key, inputs, differs)
+        if differs:
+            found.append(key)
+    profiling.count("markup.tagged_keys_checked", len(tagged.keys))
+    if cache is not None:
+        profiling.count("markup.verdict_cache_hits", cache.hits)
+        cache.put(_WHOLE_FILE, whole, found)
+        cache.retain([*tagged.keys, _WHOLE_FILE])
+        cache.save()
+    return found
+
+
+def gather(jobs=1, incremental=False):
+    """(surface, lang, path, key, english, en_sig, loc_sig) per mismatch.
+
+    ``incremental`` reuses the previous run's verdict for every (locale, key)
+    whose English and translation are unchanged; the result is the same.
+    """
+    rev = verdict_revision() if incremental else None
     found = []
     for surface in strict.SURFACES:
         if surface["kind"] == "po":
@@ -119,26 +255,34 @@ def gather():
                         )
             continue
 
-        locales = strict.json_locales(surface)
-        if strict.EN not in locales:
+        paths = corpus.locale_paths(surface["root"], surface.get("file"))
+        if strict.EN not in paths:
             continue
-        _, english = locales[strict.EN]
-        for lang, (path, values) in sorted(locales.items()):
-            if lang == strict.EN:
-                continue
-            for key, en_value in english.items():
-                if not _TAG.search(en_value):
-                    continue
-                value = values.get(key)
-                # A gap is translate-check's problem, not ours; reporting it
-                # here would name the same string under two different faults.
-                if not isinstance(value, str) or value.startswith(strict.TODO.strip()):
-                    continue
-                en_sig, loc_sig = signature(en_value), signature(value)
-                if en_sig != loc_sig:
-                    found.append(
-                        (surface["name"], lang, path, key, en_value, en_sig, loc_sig)
+        en_path = paths[strict.EN]
+        langs = [lang for lang in paths if lang != strict.EN]
+        shards = [
+            (en_path, paths[lang], f"markup-{surface['name']}-{lang}", rev)
+            for lang in langs
+        ]
+        english = corpus.flat(en_path)
+        for lang, keys in zip(
+            langs, corpus.map_sharded(gather_locale, shards, jobs)
+        ):
+            path = paths[lang]
+            values = corpus.flat(path) if keys else {}
+            for key in keys:
+                en_value = english[key]
+                found.append(
+                    (
+                        surface["name"],
+                        lang,
+                        path,
+                        key,
+                        en_value,
+                        signature(en_value),
+                        signature(values[key]),
                     )
+                )
     return found
 
 
@@ -199,9 +343,26 @@ def main() -> int:
     parser.add_argument("--prune", action="store_true")
     parser.add_argument("--requeue", action="store_true")
     parser.add_argument("--limit", type=int, default=12)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reuse cached verdicts for values unchanged since the last run",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="check locales in N worker processes (0 = one per CPU)",
+    )
+    profiling.add_argument(parser)
     args = parser.parse_args()
+    profiling.start("i18n_check_markup", args.profile)
+    profiling.instrument(
+        sys.modules[__name__], "tagged_english", "signature", prefix="markup."
+    )
 
-    violations = gather()
+    with profiling.phase("markup.gather"):
+        violations = gather(args.jobs, args.incremental)
     current = {identity(v) for v in violations}
 
     if args.baseline:
@@ -218,7 +379,8 @@ def main() -> int:
         items = [
             (s, lang, path, key, en) for s, lang, path, key, en, _, _ in violations
         ]
-        total = strict.do_requeue(items, [])
+        with profiling.phase("markup.requeue"):
+            total = strict.do_requeue(items, [])
         print(f"requeued {total} value(s); run `make translate` to refill them,")
         print("then `python3 scripts/i18n_check_markup.py --prune`.")
         return 0
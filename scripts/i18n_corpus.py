@@ -0,0 +1,592 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Shared locale corpus: parse each locale JSON once, serve every gate from it.
+
+WHY THIS EXISTS
+---------------
+``make lint`` runs ``i18n_validate.py``, ``i18n_strict.py``,
+``i18n_check_markup.py`` and ``translate_i18n.py --check`` back to back, and
+each of them used to ``json.loads`` all 14 locales (~26 MB, ~19.5k keys each)
+and re-flatten them with its own recursive helper.  Four processes, four full
+parses of the same bytes, four slightly different ``flatten()``s.  On the
+pre-push hook that is paid on every push, almost always for files nobody
+touched since the last one.
+
+HOW
+---
+Each locale file gets a flattened snapshot under ``.i18n-cache/corpus/``,
+stamped with the source's ``(mtime_ns, size, sha256)``:
+
+  * stamp matches          -> the snapshot is served as-is (the warm path);
+  * mtime/size differ but the sha256 still matches (a ``git checkout`` that
+    touched the file) -> the stamp is refreshed, nothing is re-parsed;
+  * otherwise              -> the JSON is parsed once and the snapshot rewritten.
+
+The snapshot is a flat binary file -- a fixed header and one UTF-8 blob of
+NUL-separated ``key, value`` pairs -- read through ``mmap``, so validating the
+header never reads the body and decoding it is a single C-level ``split``.  No
+pickle or marshal: those deserialise code objects, which is the wrong risk to
+take for a cache sitting in a working tree.
+
+Inside one process every path is additionally memoised, so a script that asks
+for ``en.json`` five times parses it at most once.  ``I18N_CACHE=0`` turns the
+on-disk layer off (the in-process memo stays) when a cache is not wanted.
+
+Only string leaves are served -- the same contract ``i18n_strict.flatten``
+always had.  The locale files hold nothing else.
+
+A cold parse does not build the nested tree at all: ``iter_pairs`` walks the
+document text and yields ``(dotted key, value)`` as each string leaf is
+scanned, so the only structure ever materialised is the flat dict itself.
+The nested dict ``json.loads`` returned used to coexist with its flattened
+copy (and every intermediate ``update()``d level) at the peak.
+
+Keys are interned as they are loaded, so the 14 flat views share one string
+object per dotted key.  ``KeyTable`` goes one step further for gates that walk
+every locale against English: one sorted key array, an integer ID per key,
+and each locale's values as a list aligned to those IDs, so a cross-locale
+comparison is an index-aligned scan instead of a dict lookup per key.
+
+While ``I18N_DEFER_WRITES=1`` is set, ``flat()`` also overlays the locale
+edits ``i18n_locale_store`` has journaled but not yet written, so the steps
+of one ``make i18n-fix`` see each other's changes before any file is touched.
+
+The same directory holds ``VerdictCache`` files: per-entry results of a gate,
+keyed by a digest of the inputs that produced them, so a gate can re-check
+only what changed since its last run (``i18n_strict.py --incremental``).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_profile as profiling  # noqa: E402
+
+REPO = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO / ".i18n-cache"
+SNAPSHOT_DIR = CACHE_DIR / "corpus"
+# Deferred locale edits, one JSON object per line (see i18n_locale_store).
+JOURNAL = CACHE_DIR / "locale-journal.jsonl"
+
+# Bump when the snapshot layout changes; an old snapshot then reads as a miss.
+_MAGIC = b"I18NSNP1"
+# magic, mtime_ns, size, sha256, pair count
+_HEADER = struct.Struct("<8sQQ32sI")
+_SEP = "\x00"
+
+# The tokens of the streaming reader.  ``scanstring`` is the C scanner
+# ``json.loads`` itself uses for strings; ``raw_decode`` skips the rare
+# non-string value, so escapes and numbers are never re-implemented here.
+_WS = re.compile(r"[ \t\n\r]*")
+# An escape-free key and its colon in one match -- every key in practice;
+# anything else goes through ``scanstring``.
+_PLAIN_KEY = re.compile(r'[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*:[ \t\n\r]*')
+# What may follow a member: "," or the "}" closing its object.
+_NEXT = re.compile(r"[ \t\n\r]*([,}])")
+_scanstring = json.decoder.scanstring
+_DECODER = json.JSONDecoder()
+
+# path -> (((mtime_ns, size), journal stamp), flat).  One parse per path
+# per process.
+_MEMO: Dict[Path, Tuple[tuple, Dict[str, str]]] = {}
+# [journal stamp, {resolved path: [(key, value or None), ...]}]
+_JOURNAL: list = [None, {}]
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("I18N_CACHE", "1") != "0"
+
+
+def flatten(node, prefix: str = "") -> Dict[str, str]:
+    """``{dotted key: value}`` for every string leaf of a nested locale tree."""
+    out: Dict[str, str] = {}
+    stack = [(prefix, node)]
+    while stack:
+        base, cur = stack.pop()
+        if isinstance(cur, dict):
+            # Reversed so the pops come back in document order.
+            for key, val in reversed(list(cur.items())):
+                stack.append((f"{base}.{key}" if base else key, val))
+        elif isinstance(cur, str):
+            out[base] = cur
+    return out
+
+
+def iter_pairs(text: str, strings_only: bool = True) -> Iterator[Tuple[str, object]]:
+    """``(dotted key, value)`` for each leaf of a JSON document, in order.
+
+    Streams: nothing but the current key prefix is held between leaves.
+    Leaves that are not strings (numbers, literals, arrays) are skipped, as
+    ``flatten`` skips them, unless ``strings_only`` is False.  Malformed
+    input raises ``json.JSONDecodeError`` like ``json.loads`` would.  A key
+    repeated in one object yields twice; ``dict()`` over the pairs then keeps
+    the first position and the last value, which is also what ``json.loads``
+    does for a repeated leaf.
+    """
+    ws, plain_key, after = _WS.match, _PLAIN_KEY.match, _NEXT.match
+    pos = ws(text, 0).end()
+    if not text.startswith("{", pos):
+        # Not an object: nothing to stream.  Kept for parity with flatten().
+        node = json.loads(text)
+        yield from (flatten(node).items() if strings_only else [("", node)])
+        return
+    prefixes: List[str] = []  # key prefix of each enclosing object
+    prefix = ""
+    pos += 1
+    sep = after(text, pos)
+    # "{}" closes at once; otherwise read members until the outermost "}".
+    closing = sep is not None and sep.group(1) == "}"
+    if closing:
+        pos = sep.end()
+    while True:
+        if not closing:
+            match = plain_key(text, pos)
+            if match:
+                key, pos = match.group(1), match.end()
+            else:
+                pos = ws(text, pos).end()
+                if not text.startswith('"', pos):
+                    raise json.JSONDecodeError(
+                        "Expecting property name enclosed in double quotes",
+                        text,
+                        pos,
+                    )
+                key, pos = _scanstring(text, pos + 1)
+                pos = ws(text, pos).end()
+                if not text.startswith(":", pos):
+                    raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+                pos = ws(text, pos + 1).end()
+            dotted = f"{prefix}.{key}" if prefix else key
+            if text.startswith('"', pos):
+                value, pos = _scanstring(text, pos + 1)
+                yield dotted, value
+            elif text.startswith("{", pos):
+                prefixes.append(prefix)
+                prefix = dotted
+                sep = after(text, pos + 1)
+                if sep is None or sep.group(1) != "}":
+                    pos += 1
+                    continue
+                pos = sep.end()  # an empty object: close it below
+                closing = True
+            else:
+                value, pos = _DECODER.raw_decode(text, pos)
+                if not strings_only:
+                    yield dotted, value
+        # After a member: "," starts the next one, "}" closes this object
+        # (and possibly its parents).
+        while True:
+            if closing:
+                closing = False
+            else:
+                sep = after(text, pos)
+                if sep is None:
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", text, ws(text, pos).end()
+                    )
+                pos = sep.end()
+                if sep.group(1) == ",":
+                    break
+            if not prefixes:
+                if ws(text, pos).end() != len(text):
+                    raise json.JSONDecodeError("Extra data", text, pos)
+                return
+            prefix = prefixes.pop()
+
+
+def parse_flat(text: str) -> Dict[str, str]:
+    """``flatten(json.loads(text))``, without building the nested tree."""
+    return dict(iter_pairs(text))
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _snapshot_path(path: Path) -> Path:
+    tag = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
+    return SNAPSHOT_DIR / f"{path.stem}-{tag}.snap"
+
+
+def _read_snapshot(snap: Path):
+    """``(mtime_ns, size, sha, keys, values)`` or None for a missing/bad file."""
+    try:
+        with open(snap, "rb") as fh, mmap.mmap(
+            fh.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            if len(mm) < _HEADER.size:
+                return None
+            magic, mtime_ns, size, sha, count = _HEADER.unpack_from(mm, 0)
+            if magic != _MAGIC:
+                return None
+            body = mm[_HEADER.size :].decode("utf-8")
+    except (OSError, ValueError):
+        return None
+    parts = body.split(_SEP) if count else []
+    if len(parts) != 2 * count:
+        return None
+    return mtime_ns, size, sha, parts[0::2], parts[1::2]
+
+
+def atomic_write(dest: Path, data: bytes) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=dest.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, dest)
+    except OSError:
+        # A cache that cannot be written is a slower run, not a failed one.
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _write_snapshot(snap: Path, stamp, sha: bytes, flat: Dict[str, str]) -> None:
+    body = []
+    for key, value in flat.items():
+        if _SEP in key or _SEP in value:
+            # The separator would split this pair in two.  Legal JSON, never
+            # seen in a locale -- so skip caching this file rather than
+            # inventing an escape scheme for it.
+            return
+        body.append(key)
+        body.append(value)
+    header = _HEADER.pack(_MAGIC, stamp[0], stamp[1], sha, len(flat))
+    atomic_write(snap, header + _SEP.join(body).encode("utf-8"))
+
+
+def _load(path: Path, stamp) -> Dict[str, str]:
+    snap = _snapshot_path(path) if cache_enabled() else None
+    cached = _read_snapshot(snap) if snap else None
+    if cached and (cached[0], cached[1]) == stamp:
+        profiling.count("corpus.snapshot_hits")
+        return dict(zip(map(sys.intern, cached[3]), cached[4]))
+    raw = path.read_bytes()
+    sha = hashlib.sha256(raw).digest()
+    if cached and cached[2] == sha:
+        # Same bytes, new mtime: refresh the stamp, skip the parse.
+        flat = dict(zip(map(sys.intern, cached[3]), cached[4]))
+    else:
+        flat = {
+            sys.intern(key): value for key, value in iter_pairs(raw.decode("utf-8"))
+        }
+        profiling.count("corpus.parsed")
+    if snap:
+        _write_snapshot(snap, stamp, sha, flat)
+    return flat
+
+
+def flat(path: Path) -> Dict[str, str]:
+    """``{dotted key: value}`` for one locale file, parsed at most once.
+
+    The dict is SHARED with every other caller in the process -- treat it as
+    read-only.  Mutate a copy, or queue the change on an ``i18n_locale_store``.
+    """
+    path = Path(path)
+    stamp = (_stamp(path), journal_stamp())
+    hit = _MEMO.get(path)
+    if hit and hit[0] == stamp:
+        return hit[1]
+    with profiling.phase("corpus.load"):
+        value = _load(path, stamp[0])
+    ops = journal().get(str(path.resolve())) if stamp[1] else None
+    if ops:
+        value = apply_ops(dict(value), ops)
+    _MEMO[path] = (stamp, value)
+    return value
+
+
+def content_digest(path: Path) -> str:
+    """sha256 of a locale file's bytes, plus any journaled edits to it.
+
+    Reads and hashes the file on every call, so unlike the ``(mtime_ns,
+    size)`` stamp it cannot miss an edit that kept both.  A snapshot whose
+    recorded sha256 disagrees is dropped, memo included, so the next ``flat``
+    parses the bytes that were hashed.
+    """
+    path = Path(path)
+    sha = hashlib.sha256(path.read_bytes()).digest()
+    snap = _snapshot_path(path) if cache_enabled() else None
+    try:
+        with open(snap, "rb") as fh:
+            header = fh.read(_HEADER.size)
+    except (OSError, TypeError):
+        header = b""
+    if len(header) == _HEADER.size and _HEADER.unpack(header)[3] != sha:
+        try:
+            snap.unlink()
+        except OSError:
+            pass
+        _MEMO.pop(path, None)
+    ops = journal().get(str(path.resolve())) if journal_stamp() else None
+    return input_digest(sha.hex(), json.dumps(ops or [], ensure_ascii=False))
+
+
+def deferring() -> bool:
+    """Whether locale writes go to the journal instead of the files."""
+    return os.environ.get("I18N_DEFER_WRITES") == "1"
+
+
+def journal_stamp() -> Optional[Tuple[int, int]]:
+    """The journal's ``(mtime_ns, size)``; None when not deferring or empty."""
+    if not deferring():
+        return None
+    try:
+        st = JOURNAL.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size) if st.st_size else None
+
+
+def journal() -> Dict[str, List[Tuple[str, Optional[str]]]]:
+    """Journaled edits by resolved locale path, in the order they were queued.
+
+    A value of None is a delete.  Read once per journal stamp.
+    """
+    stamp = journal_stamp()
+    if stamp is None:
+        return {}
+    if _JOURNAL[0] != stamp:
+        ops: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        with JOURNAL.open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    rec = json.loads(line)
+                    ops.setdefault(rec["file"], []).append((rec["key"], rec["value"]))
+        _JOURNAL[:] = [stamp, ops]
+    return _JOURNAL[1]
+
+
+def apply_ops(view: Dict[str, str], ops) -> Dict[str, str]:
+    """Apply ``(key, value or None)`` edits to a flat view, in place.
+
+    Deleting a key also drops every leaf beneath it, as deleting the nested
+    node would.
+    """
+    for key, value in ops:
+        if value is not None:
+            view[key] = value
+            continue
+        view.pop(key, None)
+        below = key + "."
+        for sub in [k for k in view if k.startswith(below)]:
+            del view[sub]
+    return view
+
+
+def lookup(path: Path, key: str) -> Optional[str]:
+    """The value at ``key`` in one locale file, or None."""
+    return flat(path).get(key)
+
+
+def locale_paths(root: Path, fname: Optional[str] = None) -> Dict[str, Path]:
+    """{lang: path} for a locales directory, without reading any of them."""
+    out = {}
+    if not root.is_dir():
+        return out
+    for entry in sorted(root.iterdir()):
+        # Two shapes in the wild: <lang>/translation.json (apps) and
+        # <lang>.json (docs).  A leading dot is ours (the hash sidecar).
+        if entry.is_dir() and fname:
+            path = entry / fname
+            if path.exists():
+                out[entry.name] = path
+        elif (
+            entry.is_file()
+            and entry.suffix == ".json"
+            and not entry.name.startswith(".")
+        ):
+            out[entry.stem] = entry
+    return out
+
+
+def json_locales(root: Path, fname: Optional[str] = None):
+    """{lang: (path, {key: value})} for a locales directory."""
+    return {lang: (path, flat(path)) for lang, path in locale_paths(root, fname).items()}
+
+
+# --------------------------------------------------------------------------
+# interned key table
+# --------------------------------------------------------------------------
+
+
+class KeyTable:
+    """Sorted dotted keys with integer IDs; locale values as aligned columns.
+
+    ``keys[i]`` is the key with ID ``i``.  ``column(mapping)`` is a list with
+    ``mapping``'s value for every ID (None where it lacks the key), so two
+    columns compare element-wise.  ``order(mapping)`` is the IDs of
+    ``mapping``'s keys in its own iteration order -- the order reports are
+    printed in -- skipping keys outside the table.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys: List[str] = sorted(set(map(sys.intern, keys)))
+        self.ids: Dict[str, int] = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def column(self, mapping: Mapping[str, str]) -> list:
+        get = mapping.get
+        return [get(key) for key in self.keys]
+
+    def order(self, mapping: Iterable[str]) -> array:
+        ids = self.ids
+        return array("I", [ids[key] for key in mapping if key in ids])
+
+    def select(self, keys: Iterable[str]) -> array:
+        """Sorted IDs of those ``keys`` that are in the table."""
+        ids = self.ids
+        return array("I", sorted({ids[key] for key in keys if key in ids}))
+
+
+# (path, stamp) -> KeyTable over that locale's keys.
+_TABLES: Dict[Path, Tuple[tuple, KeyTable]] = {}
+
+
+def key_table(path: Path) -> KeyTable:
+    """The ``KeyTable`` of one (reference) locale's keys, built once.
+
+    Every gate compares against English, so English's keys are the whole
+    key space a check needs: a key only a translation has is never checked.
+    """
+    path = Path(path)
+    stamp = (_stamp(path), journal_stamp())
+    hit = _TABLES.get(path)
+    if hit and hit[0] == stamp:
+        return hit[1]
+    table = KeyTable(flat(path))
+    _TABLES[path] = (stamp, table)
+    return table
+
+
+# --------------------------------------------------------------------------
+# per-locale sharding
+# --------------------------------------------------------------------------
+
+
+def resolve_jobs(jobs: int) -> int:
+    """``--jobs`` as given, with 0 meaning one worker per CPU."""
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def map_sharded(fn, shards: List[tuple], jobs: int = 1) -> list:
+    """``[fn(*shard) for shard in shards]``, across up to ``jobs`` processes.
+
+    Every gate check is independent per locale, so a shard is one locale and
+    ``fn`` a module-level function that loads what it needs through this
+    module's cache and returns compact, picklable results.  Results come back
+    in ``shards`` order whatever order the workers finish in, so a parallel
+    run reports exactly what a serial one does, in the same order.
+    """
+    jobs = min(resolve_jobs(jobs), len(shards))
+    with profiling.phase(f"shards.{fn.__name__}", items=len(shards)):
+        if jobs <= 1:
+            return [fn(*shard) for shard in shards]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(fn, *zip(*shards)))
+
+
+# --------------------------------------------------------------------------
+# verdict cache
+# --------------------------------------------------------------------------
+
+
+def input_digest(*parts: str) -> str:
+    """Short digest of the inputs one cached verdict was computed from."""
+    return hashlib.blake2b(
+        "\x00".join(parts).encode("utf-8"), digest_size=8
+    ).hexdigest()
+
+
+def revision(*sources) -> str:
+    """Digest of everything that can change a verdict wholesale.
+
+    ``sources`` are paths (hashed by content; a missing file hashes as empty)
+    or plain strings such as a Unicode database version.
+    """
+    h = hashlib.sha256()
+    for src in sources:
+        if isinstance(src, Path):
+            h.update(src.read_bytes() if src.exists() else b"")
+        else:
+            h.update(str(src).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()[:16]
+
+
+class VerdictCache:
+    """Persisted ``{key: (input digest, verdict)}`` for one gate and one file.
+
+    A verdict is reused only while the digest of its inputs is unchanged, and
+    the whole cache is dropped when ``rev`` differs -- pass a ``revision()``
+    of every rule file and of the checking code itself, so editing either
+    falls back to a full run instead of trusting answers to an old question.
+    """
+
+    def __init__(self, name: str, rev: str):
+        self.path = CACHE_DIR / "verdicts" / f"{name}.json"
+        self.rev = rev
+        self.entries: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if not cache_enabled() or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("revision") == rev:
+            self.entries = data.get("entries", {})
+
+    def get(self, key: str, digest_: str):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == digest_:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, digest_: str, verdict) -> None:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != digest_ or entry[1] != verdict:
+            self.entries[key] = [digest_, verdict]
+            self._dirty = True
+
+    def retain(self, keys) -> None:
+        """Forget entries for keys that no longer exist."""
+        stale = self.entries.keys() - set(keys)
+        for key in stale:
+            del self.entries[key]
+        self._dirty = self._dirty or bool(stale)
+
+    def save(self) -> None:
+        if not self._dirty or not cache_enabled():
+            return
+        payload = {"revision": self.rev, "entries": self.entries}
+        atomic_write(
+            self.path,
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+                "utf-8"
+            ),
+        )
+        self._dirty = False
@@ -0,0 +1,400 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Benchmark the i18n gates against a synthetic corpus of any size.
+
+WHY THIS EXISTS
+---------------
+The gates are only ever timed on the docs as they are today (about 19.5k
+keys, 14 locales).  Nothing says how ``make lint`` behaves at 100k keys or
+30 locales -- which gate goes superlinear, which one's memory grows with
+keys x locales -- until the docs get there and the build is already slow.
+
+HOW
+---
+A temporary tree is built that is a checkout as far as the scripts can tell:
+the scripts, the real ``i18n-allow.txt``, and a generated ``en.json`` of
+``--keys`` keys with ``--locales`` - 1 translations of it, plus one HTML page
+per ``--keys-per-page`` keys that references them with ``data-i18n``.  The
+corpus is meant to look like the real one to the gates:
+
+  * labels, sentences and paragraphs drawn from a fixed vocabulary, with
+    ``--markup`` of them carrying ``<code>``/``<strong>``/``<a>`` tags and
+    some ``{placeholders}``;
+  * ``--allow-rate`` of the English taken from real values the allow-list
+    exempts, kept English-identical in every locale (allow-list hits);
+  * ``--mixed-rate`` of the English ending in a native-script name
+    ("(한국어)"), so the translations mix scripts legitimately;
+  * translations are ``i18n_mock_service`` pseudo-translations into each
+    locale's script, tags and placeholders kept, so every gate passes;
+  * ``--defect-rate`` optionally plants English-identical, wrong-script,
+    tag-dropping and ``[TODO]`` values, to time the failing paths too.
+
+Locales past the real 14 are Latin-script ones (sv, da, fi, ...), which
+``wrong_script`` treats like de/fr.  ``i18n_validate`` only checks its
+canonical 14, so at higher ``--locales`` it reads just those.
+
+Each gate is run the way ``make lint`` runs it, twice: ``cold`` with an
+empty ``.i18n-cache`` (parse every locale, write every snapshot) and
+``warm`` straight after (the no-change ``make lint``).  Recorded per gate:
+wall seconds, values (keys x translated locales) per second, the exit
+status and the peak RSS of the gate's process (never below the harness's
+own, about 30 MiB, which a child inherits).  ``--output`` saves it all
+as JSON, to diff between commits; the real locales and caches are never
+touched.
+
+  make i18n-bench
+  python3 scripts/i18n_gate_bench.py --keys 100000 --locales 30 --output gates.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import subprocess  # nosec B404 - runs this repo's own scripts, argument lists only
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+from i18n_hashes import digest, dumps as dump_hashes  # noqa: E402
+from i18n_locale_store import dumps, nest  # noqa: E402
+from i18n_mock_service import pseudo_translate  # noqa: E402
+from i18n_strict import Allow, EN  # noqa: E402
+from translate_i18n import _HAS_LETTER  # noqa: E402
+
+REPO = Path(__file__).resolve().parent.parent
+LOCALES_REL = Path("assets") / "locales"
+# The real locales first, then Latin-script ones, up to 30 in all.
+LOCALES = [
+    EN, "ar", "de", "es", "fr", "hi", "it", "ja", "ko", "nl", "pt", "ru", "zh_CN", "zh_TW",
+    "sv", "da", "fi", "nb", "pl", "cs", "tr", "ro", "hu", "id", "vi", "ms", "sk", "hr",
+    "ca", "et",
+]
+
+_WORDS = (
+    "agent server host package update policy firewall service user group role "
+    "certificate report dashboard alert threshold schedule script repository "
+    "snapshot backup restore network interface kernel module process memory disk "
+    "volume partition container image registry tenant license audit log event "
+    "queue worker retry timeout connection session token secret key permission "
+    "configure install enable disable select review approve deploy monitor "
+    "upgrade migrate verify restart register remove assign export import "
+    "the a an each every new current default selected pending failed healthy "
+    "for with from to on in of by after before when until and or not "
+    "automatically securely quickly only also still"
+).split()
+_TAGS = (
+    ("<code>", "</code>"),
+    ("<strong>", "</strong>"),
+    ("<em>", "</em>"),
+    ('<a href="/docs/{}.html">', "</a>"),
+)
+_PLACEHOLDERS = ("{count}", "{name}", "{host}", "{{ version }}")
+_NATIVE = ("한국어", "日本語", "العربية", "हिन्दी", "Русский", "简体中文", "繁體中文")
+# Spliced into a translation to make it wrong-language: CJK into everything
+# but the CJK locales, which get Cyrillic.
+_WRONG = {"ja": "текст", "zh_CN": "текст", "zh_TW": "текст", "ko": "текст"}
+_DEFECTS = ("english", "wrong_script", "markup", "todo")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def _prose(rng: random.Random, markup: float) -> str:
+    """A label, sentence or paragraph, possibly with one tagged span."""
+    roll = rng.random()
+    count = (
+        rng.randint(1, 3) if roll < 0.45 else rng.randint(6, 18) if roll < 0.9
+        else rng.randint(25, 60)
+    )
+    words = [rng.choice(_WORDS) for _ in range(count)]
+    words[0] = words[0].capitalize()
+    if count > 1 and rng.random() < markup:
+        # Never the whole value: a value that is all tag is not prose.
+        start = rng.randrange(1, count)
+        end = min(count, start + rng.randint(1, 3))
+        opening, closing = rng.choice(_TAGS)
+        words[start] = opening.format(words[start]) + words[start]
+        words[end - 1] += closing
+    if count > 3 and rng.random() < 0.03:
+        words.insert(rng.randrange(1, count), rng.choice(_PLACEHOLDERS))
+    return " ".join(words) + ("." if count > 3 else "")
+
+
+def allow_pool(allow: Allow) -> List[str]:
+    """Real English values the unscoped allow-list exempts everywhere."""
+    english = corpus.parse_flat((REPO / LOCALES_REL / "en.json").read_text(encoding="utf-8"))
+    values = [v for v in english.values() if _HAS_LETTER.search(v)]
+    ids = allow.allowed_ids([""] * len(values), values, range(len(values)))
+    return sorted({values[i] for i in ids})
+
+
+def generate(root: Path, args: argparse.Namespace) -> Dict[str, object]:
+    """Write the corpus, the source-hash sidecar and the pages under ``root``."""
+    rng = random.Random(args.seed)
+    langs = LOCALES[: args.locales]
+    allow = Allow(root / "i18n-allow.txt")
+    pool = allow_pool(allow)
+    english: Dict[str, str] = {}
+    exempt = set()
+    per_page = args.keys_per_page
+    for i in range(args.keys):
+        page = i // per_page
+        key = f"bench.s{page // 20:03d}.p{page:05d}.t{i % per_page}"
+        roll = rng.random()
+        value = None
+        if pool and roll < args.allow_rate:
+            value = rng.choice(pool)
+            if allow.allowed_ids([key], [value], [0]):
+                exempt.add(key)
+            else:
+                value = None
+        if value is None:
+            value = _prose(rng, args.markup)
+            if rng.random() < args.mixed_rate:
+                value += f" ({rng.choice(_NATIVE)})"
+        english[key] = value
+
+    locales = root / LOCALES_REL
+    locales.mkdir(parents=True)
+    defects = {kind: 0 for kind in _DEFECTS}
+    for lang in langs:
+        if lang == EN:
+            flat = english
+        else:
+            flat = {}
+            for key, value in english.items():
+                if key in exempt:
+                    flat[key] = value
+                    continue
+                text = pseudo_translate(value, lang)[0]
+                if rng.random() < args.defect_rate:
+                    kind = rng.choice(_DEFECTS)
+                    if kind == "english":
+                        text = value
+                    elif kind == "wrong_script":
+                        text += " " + _WRONG.get(lang, "汉字")
+                    elif kind == "markup" and _TAG.search(text):
+                        text = _TAG.sub("", text)
+                    elif kind == "todo":
+                        text = "[TODO] " + value
+                    else:
+                        kind = None
+                    if kind:
+                        defects[kind] += 1
+                flat[key] = text
+        (locales / f"{lang}.json").write_text(dumps(nest(flat)), encoding="utf-8")
+    (locales / ".i18n-source-hashes.json").write_text(
+        dump_hashes({key: digest(value) for key, value in english.items()}),
+        encoding="utf-8",
+    )
+
+    pages = root / "docs" / "bench"
+    pages.mkdir(parents=True)
+    keys = list(english)
+    referenced = 0
+    for page in range(0, len(keys), per_page):
+        body = []
+        for key in keys[page:page + per_page]:
+            if rng.random() >= args.html_share:
+                continue  # only looked up from JS, as some real keys are
+            value = english[key]
+            attrs = f'data-i18n="{key}"' + (" data-i18n-html" if "<" in value else "")
+            body.append(f"      <p {attrs}>{value}</p>")
+            referenced += 1
+        (pages / f"page-{page // per_page:05d}.html").write_text(
+            "<!DOCTYPE html>\n<html lang=\"en\">\n  <head>\n"
+            "    <meta charset=\"utf-8\">\n"
+            f"    <title>Bench page {page // per_page}</title>\n"
+            "  </head>\n  <body>\n    <main>\n"
+            + "\n".join(body)
+            + "\n    </main>\n  </body>\n</html>\n",
+            encoding="utf-8",
+        )
+    return {
+        "keys": len(english),
+        "locales": len(langs),
+        "pages": -(-len(keys) // per_page),
+        "html_keys": referenced,
+        "allow_hits": len(exempt),
+        "tagged": sum(1 for value in english.values() if "<" in value),
+        "defects": defects,
+    }
+
+
+def sandbox(root: Path) -> None:
+    """Copy the scripts and the allow-list into ``root``."""
+    shutil.copytree(
+        REPO / "scripts",
+        root / "scripts",
+        ignore=shutil.ignore_patterns("__pycache__", "*.png", "*.pptx"),
+    )
+    shutil.copy2(REPO / "i18n-allow.txt", root / "i18n-allow.txt")
+
+
+def run(root: Path, argv: List[str], may_fail: bool) -> Tuple[float, int, int]:
+    """``(wall seconds, peak RSS in KiB, exit status)`` of one gate run."""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("I18N_PROFILE", "I18N_PROFILE_CPROFILE", "I18N_HASH_STORE")
+    }
+    env.update(I18N_CACHE="1", I18N_DEFER_WRITES="0")
+    with tempfile.TemporaryFile() as log:
+        start = time.perf_counter()
+        with subprocess.Popen(  # nosec B603 - fixed argv from this repo, no shell
+            [sys.executable, *argv], cwd=root, env=env, stdout=log, stderr=log
+        ) as proc:
+            # wait4, not wait: the rusage of this one child, whatever ran before.
+            _pid, status, usage = os.wait4(proc.pid, 0)
+            seconds = time.perf_counter() - start
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode not in ((0, 1) if may_fail else (0,)):
+            log.seek(0)
+            tail = log.read().decode("utf-8", "replace")[-4000:]
+            sys.exit(f"ERROR: {' '.join(argv)} exited {proc.returncode}:\n{tail}")
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return seconds, peak, proc.returncode
+
+
+def gates(langs: List[str], jobs: int) -> List[Tuple[str, List[str]]]:
+    """Each gate's command line, as ``make lint`` runs it."""
+    jobs_opt = ["--jobs", str(jobs)]
+    targets = ",".join(lang for lang in langs if lang != EN)
+    return [
+        ("i18n_strict", ["scripts/i18n_strict.py", "--incremental", *jobs_opt]),
+        ("i18n_check_markup", ["scripts/i18n_check_markup.py", "--incremental", *jobs_opt]),
+        ("i18n_validate", ["scripts/i18n_validate.py", "--validate"]),
+        (
+            "translate_check",
+            ["scripts/translate_i18n.py", "--check", *jobs_opt, "--langs", targets],
+        ),
+    ]
+
+
+def bench(args: argparse.Namespace, root: Path) -> Dict[str, object]:
+    sandbox(root)
+    start = time.perf_counter()
+    # Generated in a spawned process: on Linux a child starts with its
+    # parent's peak RSS as its own, so a harness that had held the corpus
+    # would report that as every gate's peak.
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        corpus_info = pool.submit(generate, root, args).result()
+    generated = time.perf_counter() - start
+    values = corpus_info["keys"] * (corpus_info["locales"] - 1)
+    may_fail = args.defect_rate > 0
+    results: Dict[str, object] = {}
+    for name, argv in gates(LOCALES[: args.locales], args.jobs):
+        shutil.rmtree(root / ".i18n-cache", ignore_errors=True)
+        cold, cold_rss, status = run(root, argv, may_fail)
+        warm, warm_rss = None, 0
+        for _ in range(args.repeat):
+            seconds, rss, _status = run(root, argv, may_fail)
+            warm = seconds if warm is None else min(warm, seconds)
+            warm_rss = max(warm_rss, rss)
+        results[name] = {
+            "cold_seconds": round(cold, 3),
+            "warm_seconds": round(warm, 3),
+            "cold_values_per_second": round(values / cold),
+            "warm_values_per_second": round(values / warm),
+            "cold_peak_rss_kib": cold_rss,
+            "warm_peak_rss_kib": warm_rss,
+            "exit": status,
+        }
+    return {
+        "corpus": {
+            **corpus_info,
+            "values": values,
+            "markup": args.markup,
+            "allow_rate": args.allow_rate,
+            "mixed_rate": args.mixed_rate,
+            "defect_rate": args.defect_rate,
+            "seed": args.seed,
+        },
+        "jobs": args.jobs,
+        "python": sys.version.split()[0],
+        "generate_seconds": round(generated, 3),
+        "gates": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the i18n gates against a synthetic corpus."
+    )
+    parser.add_argument("--keys", type=int, default=20000, help="English keys")
+    parser.add_argument(
+        "--locales",
+        type=int,
+        default=14,
+        choices=range(2, len(LOCALES) + 1),
+        metavar=f"2..{len(LOCALES)}",
+        help="locales including English",
+    )
+    parser.add_argument("--keys-per-page", type=int, default=120)
+    parser.add_argument(
+        "--html-share", type=float, default=0.95, help="share of keys a page references"
+    )
+    parser.add_argument(
+        "--markup", type=float, default=0.05, help="share of English carrying tags"
+    )
+    parser.add_argument(
+        "--allow-rate", type=float, default=0.03, help="share of allow-listed English"
+    )
+    parser.add_argument(
+        "--mixed-rate", type=float, default=0.02, help="share of mixed-script English"
+    )
+    parser.add_argument(
+        "--defect-rate",
+        type=float,
+        default=0.0,
+        help="share of translations made to fail a gate (gates then exit 1)",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="--jobs for the gates")
+    parser.add_argument("--repeat", type=int, default=1, help="warm runs; the best counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workdir", type=Path, help="build the tree here and keep it (must not exist)"
+    )
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+    args.repeat = max(1, args.repeat)
+
+    if args.workdir:
+        args.workdir.mkdir(parents=True)
+        result = bench(args, args.workdir.resolve())
+    else:
+        with tempfile.TemporaryDirectory(prefix="i18n-gate-bench-") as tmp:
+            result = bench(args, Path(tmp))
+
+    info = result["corpus"]
+    print(
+        f"gate bench: {info['keys']} keys x {info['locales']} locales "
+        f"({info['values']} values), {info['pages']} pages, {info['tagged']} tagged, "
+        f"{info['allow_hits']} allow-listed; generated in {result['generate_seconds']:.1f}s"
+    )
+    for name, row in result["gates"].items():
+        print(
+            f"  {name:<18} cold {row['cold_seconds']:7.2f}s "
+            f"({row['cold_values_per_second']:>9} values/s)  "
+            f"warm {row['warm_seconds']:7.2f}s "
+            f"({row['warm_values_per_second']:>9} values/s)  "
+            f"peak {row['cold_peak_rss_kib'] / 1024:7.1f} MiB  exit {row['exit']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -49,17 +49,57 @@ from -- which is the precise claim the sidecar is supposed to make.
 
 Dry runs write nothing: with no service configured the translator never
 writes, so ``translated_keys`` is empty and this is a no-op.
+
+THE OPTIONAL SQLITE STORE
+-------------------------
+The JSON sidecar is ~1.3 MB of indented ``{key: hash}`` for ~19.5k keys, and
+every recording run used to parse all of it and rewrite all of it, sorted --
+for a translate run that touched 20 keys.  With ``I18N_HASH_STORE=sqlite`` the
+hashes live in an indexed table under ``.i18n-cache/`` instead: a run upserts
+just the rows it changed, and the gate reads the table rather than the JSON.
+
+The JSON stays the reviewed, committed form.  The store remembers the sha256
+of the JSON it last imported or exported:
+
+  * JSON unchanged since -> the table is current and the JSON is not parsed;
+  * JSON changed (a pull, a checkout, a hand edit) -> the table is re-imported
+    from it, and the run's own unexported updates are replayed on top;
+  * the JSON changed a key that ALSO has an unexported update, to a third
+    value -> ``HashStoreConflict``; neither answer can be dropped silently.
+
+``python3 scripts/i18n_hashes.py --export`` (``make i18n-hashes-export``)
+writes the JSON, byte-identical to what a JSON-mode run would have written.
+It leaves the JSON alone when there is no store, and it still exports a store
+left by an earlier sqlite run when the variable has since been unset.
+Without the environment variable nothing changes: the JSON is read and
+written directly, as before.
 """
 
+import argparse
 import hashlib
 import json
+import os
+import sqlite3
+import sys
 from pathlib import Path
 from typing import Dict, Iterable, Mapping, Optional, Set
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+
 # The sidecar lives in the locales root for every surface that has one
 # (docs ``assets/locales``, frontend ``public/locales``), so callers never
 # need to plumb a path through.
 SIDECAR_NAME = ".i18n-source-hashes.json"
+DOCS_LOCALES = Path(__file__).resolve().parent.parent / "assets" / "locales"
+
+STORE_ENV = "I18N_HASH_STORE"
+STORE_DIR = corpus.CACHE_DIR / "hashes"
+
+
+class HashStoreConflict(RuntimeError):
+    """The JSON sidecar changed while the sqlite store had unexported rows."""
 
 
 def digest(text: str) -> str:
@@ -72,19 +112,213 @@ def sidecar_path(base: Path) -> Path:
     return Path(base) / SIDECAR_NAME
 
 
-def load(path: Path) -> Dict[str, str]:
-    path = Path(path)
+def use_store() -> bool:
+    return os.environ.get(STORE_ENV, "json") == "sqlite"
+
+
+def store_path(sidecar: Path) -> Path:
+    """Where the sqlite form of ``sidecar`` lives (it may not exist yet)."""
+    tag = corpus.input_digest(str(Path(sidecar).resolve()))
+    return STORE_DIR / f"{Path(sidecar).parent.name}-{tag}.sqlite"
+
+
+def dumps(hashes: Mapping[str, str]) -> str:
+    """The sidecar's one serialisation: sorted, indented, newline-terminated."""
+    return json.dumps(dict(hashes), indent=2, sort_keys=True) + "\n"
+
+
+class HashStore:
+    """The sqlite form of one sidecar; see "THE OPTIONAL SQLITE STORE" above.
+
+    ``pending`` holds every row changed since the last export, with the value
+    it replaced, which is what lets a re-import tell a key both sides edited
+    from one only this side did.
+    """
+
+    def __init__(self, sidecar: Path):
+        self.sidecar = Path(sidecar)
+        self.path = store_path(self.sidecar)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS hashes"
+            " (key TEXT PRIMARY KEY, digest TEXT NOT NULL) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS pending"
+            " (key TEXT PRIMARY KEY, digest TEXT NOT NULL, base TEXT) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);"
+        )
+        try:
+            self._sync()
+        except BaseException:
+            self.db.close()
+            raise
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _json_sha(self) -> str:
+        if not self.sidecar.exists():
+            return ""
+        return hashlib.sha256(self.sidecar.read_bytes()).hexdigest()
+
+    def _set_json_sha(self, sha: str) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('json_sha', ?)",
+            (sha,),
+        )
+
+    @property
+    def dirty(self) -> int:
+        """Keys changed since the JSON was last exported."""
+        return self.db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def _sync(self) -> None:
+        sha = self._json_sha()
+        row = self.db.execute(
+            "SELECT value FROM meta WHERE name = 'json_sha'"
+        ).fetchone()
+        if row and row[0] == sha:
+            return
+        fresh = _read_json(self.sidecar)
+        pending = self.db.execute("SELECT key, digest, base FROM pending").fetchall()
+        clashes = [
+            key
+            for key, digest_, base in pending
+            if fresh.get(key) not in (base, digest_)
+        ]
+        if clashes:
+            raise HashStoreConflict(
+                f"{self.sidecar.name} changed {len(clashes)} key(s) that also "
+                f"have unexported updates in {self.path} (e.g. {clashes[0]}).  "
+                f"Delete the store to take the JSON as it is, or restore the "
+                f"JSON and run `python3 scripts/i18n_hashes.py --export`."
+            )
+        with self.db:
+            self.db.execute("DELETE FROM hashes")
+            self.db.executemany(
+                "INSERT INTO hashes (key, digest) VALUES (?, ?)", fresh.items()
+            )
+            for key, digest_, _base in pending:
+                if fresh.get(key) == digest_:
+                    # The JSON caught up with this update on its own.
+                    self.db.execute("DELETE FROM pending WHERE key = ?", (key,))
+                    continue
+                self.db.execute(
+                    "INSERT OR REPLACE INTO hashes (key, digest) VALUES (?, ?)",
+                    (key, digest_),
+                )
+            self._set_json_sha(sha)
+
+    def load(self) -> Dict[str, str]:
+        return dict(self.db.execute("SELECT key, digest FROM hashes"))
+
+    def lookup(self, keys: Iterable[str]) -> Dict[str, str]:
+        """The recorded hash of each of ``keys`` that has one: indexed reads,
+        so a run that touched 20 keys reads 20 rows, not the table."""
+        out = {}
+        for key in keys:
+            row = self.db.execute(
+                "SELECT digest FROM hashes WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                out[key] = row[0]
+        return out
+
+    def update(self, changes: Mapping[str, str]) -> None:
+        """Upsert just these rows; the JSON is left for ``export``."""
+        if not changes:
+            return
+        with self.db:
+            for key, new in changes.items():
+                # Keep the first ``base``: it is what the JSON still holds.
+                self.db.execute(
+                    "INSERT OR IGNORE INTO pending (key, digest, base)"
+                    " VALUES (?, ?, (SELECT digest FROM hashes WHERE key = ?))",
+                    (key, new, key),
+                )
+                self.db.execute(
+                    "UPDATE pending SET digest = ? WHERE key = ?", (new, key)
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO hashes (key, digest) VALUES (?, ?)",
+                    (key, new),
+                )
+
+    def replace(self, hashes: Mapping[str, str]) -> None:
+        """Make the table AND the JSON exactly ``hashes`` (a baseline)."""
+        with self.db:
+            self.db.execute("DELETE FROM hashes")
+            self.db.executemany(
+                "INSERT INTO hashes (key, digest) VALUES (?, ?)", hashes.items()
+            )
+        self.export()
+
+    def export(self) -> bool:
+        """Write the JSON from the table.  True if its bytes changed."""
+        data = dumps(self.load()).encode("utf-8")
+        changed = not self.sidecar.exists() or self.sidecar.read_bytes() != data
+        if changed:
+            self.sidecar.write_bytes(data)
+        with self.db:
+            self.db.execute("DELETE FROM pending")
+            self._set_json_sha(hashlib.sha256(data).hexdigest())
+        return changed
+
+
+def _read_json(path: Path) -> Dict[str, str]:
     if not path.exists():
         return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load(path: Path) -> Dict[str, str]:
+    path = Path(path)
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except (OSError, ValueError):
+        if use_store():
+            with HashStore(path) as store:
+                return store.load()
+        return _read_json(path)
+    except (OSError, ValueError, sqlite3.Error):
         # A corrupt sidecar must not take the translation run down with it.
         # Returning {} degrades to "nothing recorded", which the gate reports
         # as unchecked rather than as a false stale.
         return {}
 
 
+def read(path: Path) -> Dict[str, str]:
+    """The gate's read: like ``load``, but a corrupt sidecar is an error.
+
+    ``load`` degrades to ``{}`` so a translate run survives; a gate that did
+    that would pass everything as "nothing recorded"."""
+    path = Path(path)
+    if use_store():
+        with HashStore(path) as store:
+            if store.dirty:
+                print(
+                    f"note: {store.dirty} source-hash update(s) not yet in "
+                    f"{path.name}; `make i18n-hashes-export` before committing",
+                    file=sys.stderr,
+                )
+            return store.load()
+    return _read_json(path)
+
+
+def write_all(path: Path, hashes: Mapping[str, str]) -> None:
+    """Replace the whole sidecar (``i18n_strict.py --baseline``)."""
+    path = Path(path)
+    if use_store():
+        with HashStore(path) as store:
+            store.replace(hashes)
+    else:
+        path.write_text(dumps(hashes), encoding="utf-8")
+
+
 def _is_gap(value: Optional[str]) -> bool:
     """Missing, blank, or still queued -- i.e. not a translation yet."""
     if value is None or not isinstance(value, str):
@@ -117,19 +351,67 @@ def record_translated(
         return 0
 
     path = sidecar_path(base)
-    hashes = load(path)
-    changed = 0
-    for key in sorted(keys):
-        # Every processed locale must now hold a real value for this key.
-        if any(_is_gap(flat.get(key)) for flat in locale_flats.values()):
-            continue
-        new = digest(en_flat[key])
-        if hashes.get(key) != new:
-            hashes[key] = new
-            changed += 1
-
-    if changed:
-        path.write_text(
-            json.dumps(hashes, indent=2, sort_keys=True) + "\n", encoding="utf-8"
-        )
-    return changed
+    store = HashStore(path) if use_store() else None
+    try:
+        hashes = store.lookup(keys) if store else load(path)
+        changes: Dict[str, str] = {}
+        for key in sorted(keys):
+            # Every processed locale must now hold a real value for this key.
+            if any(_is_gap(flat.get(key)) for flat in locale_flats.values()):
+                continue
+            new = digest(en_flat[key])
+            if hashes.get(key) != new:
+                changes[key] = new
+
+        if store:
+            # Just the changed rows; the JSON waits for ``--export``.
+            store.update(changes)
+        elif changes:
+            hashes.update(changes)
+            path.write_text(dumps(hashes), encoding="utf-8")
+    finally:
+        if store:
+            store.close()
+    return len(changes)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Export or inspect the sqlite source-hash store "
+        f"({STORE_ENV}=sqlite)."
+    )
+    parser.add_argument(
+        "--base",
+        type=Path,
+        default=DOCS_LOCALES,
+        help="locales root holding the sidecar (default: assets/locales)",
+    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument(
+        "--export", action="store_true", help="write the JSON sidecar from the store"
+    )
+    mode.add_argument(
+        "--status", action="store_true", help="report unexported updates"
+    )
+    args = parser.parse_args()
+    path = sidecar_path(args.base)
+    if not use_store() and not store_path(path).exists():
+        # JSON mode wrote the sidecar directly; there is nothing to export,
+        # and opening a store here would only create an empty one.
+        print(f"no sqlite store ({STORE_ENV} is not sqlite): {path} is current")
+        return 0
+    try:
+        with HashStore(path) as store:
+            if args.status:
+                print(f"{store.dirty} unexported update(s) in {store.path}")
+                return 0
+            changed = store.export()
+    except HashStoreConflict as exc:
+        print(f"FAIL: {exc}", file=sys.stderr)
+        return 1
+    print(f"{'wrote' if changed else 'unchanged'}: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Persistent index of every ``data-i18n`` key the site's HTML references.
+
+WHY THIS EXISTS
+---------------
+Three tools need "which keys do the pages use, and where":
+``i18n_validate.py`` regex-scanned all 161 pages on every ``make lint``,
+``seed_missing_i18n.py`` parsed every page with BeautifulSoup to find a
+handful of keys, and ``i18n_autotag.py`` parses them again.  The pages barely
+change between runs, so nearly all of that work re-derives last run's answer.
+
+HOW
+---
+``.i18n-cache/html-index.json`` holds, per page, its ``(mtime_ns, size)``
+and, for each ``data-i18n="..."`` occurrence in document order, the key, the
+offset of its element's ``<`` and whether the element has ``data-i18n-html``.
+
+``load()`` re-scans only the pages whose stamp changed (and drops deleted
+ones), so a warm run stats 161 files and reads none.  Key presence and
+orphan checks are then set operations on ``HtmlIndex.keys()``.
+
+Inner HTML is deliberately NOT stored: it would make the index several
+times larger than the keys, and loading that on every ``make lint`` cost
+more than the regex scan the index replaces.  ``occurrences()`` re-reads
+just the pages holding the keys asked for and cuts the raw source between
+the open tag and its matching close (``matching_close_offset``).
+
+The scan is a regex, not a parser: an occurrence counts wherever
+``i18n_validate`` always counted it.  Tools that need BeautifulSoup's view
+of an element (``seed_missing_i18n``) use the index to find WHICH pages to
+parse, then parse only those.
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+import i18n_profile as profiling  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INDEX_PATH = corpus.CACHE_DIR / "html-index.json"
+
+DATA_I18N = re.compile(r'data-i18n\s*=\s*"([^"]+)"')
+# One open tag, applied at a known "<" (same shape i18n_autotag uses).
+_OPEN_TAG_RE = re.compile(r"<([A-Za-z][A-Za-z0-9]*)([^>]*?)(/?)>", re.DOTALL)
+# Elements with no close tag, hence no inner HTML.
+_VOID = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+})
+
+
+class Occurrence(NamedTuple):
+    file: str  # repo-relative, '/'-separated
+    offset: int  # of the element's "<" (of the attribute, outside a tag)
+    inner: Optional[str]  # raw inner HTML; None for void/unclosed/non-tag
+    is_html: bool  # the element carries data-i18n-html
+
+
+@lru_cache(maxsize=None)
+def _same_name_tag_re(tagname: str) -> re.Pattern:
+    """Open or close tag of one name; compiled once per name, not per call."""
+    return re.compile(
+        r"<\s*(/?)\s*" + re.escape(tagname) + r"(\s|>|/)",
+        re.IGNORECASE,
+    )
+
+
+def matching_close_offset(raw: str, open_end: int, tagname: str) -> int | None:
+    """Find the offset of the matching </tagname> for the open tag.
+
+    Uses naive depth counting on the raw string after ``open_end``.  This
+    is good enough for well-formed HTML.  Skips nested same-name tags.
+    """
+    pattern = _same_name_tag_re(tagname)
+    depth = 1
+    pos = open_end
+    while pos < len(raw):
+        m = pattern.search(raw, pos)
+        if not m:
+            return None
+        is_close = m.group(1) == "/"
+        if is_close:
+            depth -= 1
+            if depth == 0:
+                return m.start()
+        else:
+            depth += 1
+        pos = m.end()
+    return None
+
+
+def html_files(root: Path = REPO_ROOT) -> List[Path]:
+    """The site's pages: every .html outside dot-directories and node_modules."""
+    return sorted(
+        p for p in root.rglob("*.html")
+        if "node_modules" not in p.parts
+        and not any(part.startswith(".") for part in p.relative_to(root).parts)
+    )
+
+
+def scan(raw: str) -> dict:
+    """One page's index record (minus its stamp): parallel lists in
+    document order, plus the positions whose element has data-i18n-html."""
+    keys, offsets, html = [], [], []
+    for match in DATA_I18N.finditer(raw):
+        lt = raw.rfind("<", 0, match.start())
+        tag = _OPEN_TAG_RE.match(raw, lt) if lt != -1 else None
+        if tag is None or tag.end() < match.end():
+            # Not an attribute of an element (script text, a comment...):
+            # still a reference, anchored at the attribute itself.
+            lt = match.start()
+        elif "data-i18n-html" in tag.group(2):
+            html.append(len(keys))
+        keys.append(match.group(1))
+        offsets.append(lt)
+    return {"keys": keys, "offsets": offsets, "html": html}
+
+
+def inner_html(raw: str, offset: int) -> Optional[str]:
+    """Raw inner HTML of the element whose open tag starts at ``offset``;
+    None for a void or unclosed element, or an offset that is not a tag."""
+    tag = _OPEN_TAG_RE.match(raw, offset)
+    if tag is None:
+        return None
+    name = tag.group(1).lower()
+    if tag.group(3) or name in _VOID:
+        return None
+    close = matching_close_offset(raw, tag.end(), name)
+    return raw[tag.end():close] if close is not None else None
+
+
+class HtmlIndex:
+    """``{page: record}`` for the whole site; see ``load``."""
+
+    def __init__(self, root: Path, pages: Dict[str, dict]):
+        self.root = root
+        self.pages = pages
+
+    def keys(self) -> Set[str]:
+        return {key for page in self.pages.values() for key in page["keys"]}
+
+    def pages_with(self, keys: Iterable[str]) -> List[str]:
+        """Pages referencing any of ``keys``, in path order."""
+        wanted = set(keys)
+        return [
+            rel
+            for rel, page in self.pages.items()
+            if not wanted.isdisjoint(page["keys"])
+        ]
+
+    def occurrences(self, keys: Iterable[str]) -> Dict[str, List[Occurrence]]:
+        """``{key: [Occurrence, ...]}`` for those of ``keys`` the site uses.
+
+        Reads only the pages that hold them, to cut out the inner HTML."""
+        wanted = set(keys)
+        out: Dict[str, List[Occurrence]] = {}
+        for rel in self.pages_with(wanted):
+            page = self.pages[rel]
+            raw = (self.root / rel).read_text(encoding="utf-8")
+            flagged = set(page["html"])
+            for i, (key, offset) in enumerate(zip(page["keys"], page["offsets"])):
+                if key in wanted:
+                    out.setdefault(key, []).append(
+                        Occurrence(rel, offset, inner_html(raw, offset), i in flagged)
+                    )
+        return out
+
+
+def load(root: Path = REPO_ROOT) -> HtmlIndex:
+    """The index, brought up to date with the pages on disk.
+
+    Only pages whose ``(mtime_ns, size)`` changed since the saved index are
+    read; the refreshed index is saved back when anything changed.
+    ``I18N_CACHE=0`` scans every page and saves nothing.
+    """
+    cached: dict = {}
+    if corpus.cache_enabled():
+        try:
+            cached = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cached = {}
+    rev = corpus.revision(Path(__file__).resolve(), str(root.resolve()))
+    old = cached.get("pages", {}) if cached.get("revision") == rev else {}
+
+    pages: Dict[str, dict] = {}
+    dirty = False
+    for path in html_files(root):
+        rel = path.relative_to(root).as_posix()
+        st = path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        hit = old.get(rel)
+        if hit and hit["stamp"] == stamp:
+            pages[rel] = hit
+            continue
+        try:
+            raw = path.read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            raw = ""  # not a page we can read; it references nothing
+        pages[rel] = {"stamp": stamp, **scan(raw)}
+        profiling.count("html_index.pages_scanned")
+        dirty = True
+    dirty = dirty or len(pages) != len(old)
+    profiling.count("html_index.pages", len(pages))
+
+    if dirty and corpus.cache_enabled():
+        payload = {"revision": rev, "pages": pages}
+        corpus.atomic_write(
+            INDEX_PATH,
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+                "utf-8"
+            ),
+        )
+    return HtmlIndex(root, pages)
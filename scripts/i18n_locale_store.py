@@ -0,0 +1,366 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""One place that writes locale JSON: queue edits, apply them once per file.
+
+WHY THIS EXISTS
+---------------
+Five tools edit the locale files -- ``i18n_validate.py --seed``,
+``seed_missing_i18n.py``, ``i18n_autotag.py``, ``i18n_strict.py --requeue``
+and ``translate_i18n.py`` -- and each carried its own load / set-dotted /
+``json.dumps`` / ``write_text`` cycle.  ``make i18n-fix`` chains three of
+them, so every locale (~2 MB each) was parsed and rewritten three or four
+times per run, translate writing some of them twice itself (once for the
+intentionally-English heal, once for the translations).  Each rewrite also
+bumped the file's mtime, invalidating every cached view of it, and a
+``write_text`` interrupted half-way left a truncated locale behind.  The
+tools did not even agree on what to do when a dotted key ran into an
+existing leaf: one clobbered it, one refused silently, one warned.
+
+HOW
+---
+``LocaleStore`` queues ``set`` / ``delete`` / ``requeue`` edits per file
+against the flat view (``view()`` shows them applied), refusing -- with a
+warning -- any edit that would turn a leaf into a subtree or the reverse.
+``commit()`` then applies each file's queue to its nested document in one
+pass and writes it once, via temp-file-and-rename, and only when the bytes
+actually differ.  The output is exactly what the tools always wrote:
+``json.dumps(doc, ensure_ascii=False, indent=2) + "\\n"``, keys in document
+order, new keys appended to their parent.
+
+With ``I18N_DEFER_WRITES=1``, ``commit()`` appends the edits to
+``.i18n-cache/locale-journal.jsonl`` instead, and ``i18n_corpus.flat()``
+overlays that journal, so the next tool in the chain sees them without any
+file being touched.  ``python3 scripts/i18n_locale_store.py --flush`` applies
+the journal -- one write per changed file -- and removes it.  That is how
+``make i18n-fix`` rewrites each locale at most once.
+
+Outside a deferred run the journal is ignored entirely (a leftover one never
+leaks into a gate); ``--status`` reports one that was never flushed, and
+``--assert-empty`` fails on one, which ``make i18n-fix`` checks first.
+
+``.po`` catalogs are not JSON: ``i18n_po.Catalog.requeue`` empties their
+entries by splicing ``msgstr ""`` over each one's indexed byte span.
+
+SERIALISATION
+-------------
+``json.dumps`` only uses its C encoder when ``indent`` is None; the indented
+form every locale is committed in runs the pure-Python ``_iterencode``,
+which was most of the cost of a write.  ``dumps`` emits the same bytes
+directly: structure is laid out here, and every key and string value goes
+through ``json.encoder.encode_basestring`` -- the C escaper ``json.dumps``
+itself uses for ``ensure_ascii=False`` -- so escaping cannot drift from the
+stdlib.  Anything other than a dict or a string (the locales hold none) is
+handed to ``json.dumps`` and re-indented.  ``--verify`` re-serialises every
+locale and compares it byte-for-byte against the file and the stdlib.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+import i18n_profile as profiling  # noqa: E402
+
+LOCALES_DIR = Path(__file__).resolve().parent.parent / "assets" / "locales"
+TODO = "[TODO] "
+
+
+def _layout(node: dict, level: int, out: List[str]) -> None:
+    """Append ``node`` as ``json.dumps(indent=2)`` lays it out at ``level``."""
+    if not node:
+        out.append("{}")
+        return
+    pad = "\n" + "  " * (level + 1)
+    sep = "," + pad
+    run: List[str] = []  # consecutive string leaves, joined in one go
+    lead = "{" + pad
+    for key, value in node.items():
+        if isinstance(value, str):
+            run.append(f"{encode_basestring(key)}: {encode_basestring(value)}")
+            continue
+        if run:
+            out.append(lead + sep.join(run))
+            run, lead = [], sep
+        out.append(f"{lead}{encode_basestring(key)}: ")
+        lead = sep
+        if isinstance(value, dict):
+            _layout(value, level + 1, out)
+        else:
+            out.append(
+                json.dumps(value, ensure_ascii=False, indent=2).replace("\n", pad)
+            )
+    if run:
+        out.append(lead + sep.join(run))
+    out.append("\n" + "  " * level + "}")
+
+
+def dumps(doc: dict) -> str:
+    """The one serialisation every locale file is written in:
+    ``json.dumps(doc, ensure_ascii=False, indent=2) + "\\n"``, byte for byte."""
+    out: List[str] = []
+    _layout(doc, 0, out)
+    out.append("\n")
+    return "".join(out)
+
+
+def _prefixes(view) -> Set[str]:
+    """Every dotted key that names a subtree, i.e. a proper prefix of a leaf."""
+    out: Set[str] = set()
+    for key in view:
+        dot = key.rfind(".")
+        while dot != -1:
+            head = key[:dot]
+            if head in out:
+                break
+            out.add(head)
+            dot = key.rfind(".", 0, dot)
+    return out
+
+
+def _apply(doc: dict, key: str, value: Optional[str]) -> bool:
+    """Apply one edit to a nested document; False (and no change) when the
+    edit would replace a subtree by a leaf or a leaf by a subtree."""
+    parts = key.split(".")
+    node = doc
+    for part in parts[:-1]:
+        nxt = node.get(part)
+        if nxt is None:
+            if value is None:
+                return True  # nothing there to delete
+            nxt = node[part] = {}
+        elif not isinstance(nxt, dict):
+            return False
+        node = nxt
+    if value is None:
+        node.pop(parts[-1], None)
+        return True
+    if isinstance(node.get(parts[-1]), dict):
+        return False
+    node[parts[-1]] = value
+    return True
+
+
+def nest(flat: Dict[str, str]) -> dict:
+    """The nested document ``flat`` (``{dotted key: value}``) is the view of,
+    keys in its order -- for writing a locale that was built flat."""
+    doc: dict = {}
+    for key, value in flat.items():
+        _apply(doc, key, value)
+    return doc
+
+
+def write_document(path: Path, ops) -> bool:
+    """Apply ``(key, value or None)`` edits to one file; True if it changed.
+
+    The file is read once and written once, atomically, and not at all when
+    the edits leave its bytes as they were.
+    """
+    raw = path.read_bytes()
+    doc = json.loads(raw)
+    for key, value in ops:
+        _apply(doc, key, value)
+    data = dumps(doc).encode("utf-8")
+    if data == raw:
+        return False
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+class LocaleStore:
+    """Queued edits to any number of locale JSON files; see the module doc."""
+
+    def __init__(self) -> None:
+        # resolved path -> [(key, value or None), ...] in queue order
+        self._ops: Dict[Path, List[Tuple[str, Optional[str]]]] = {}
+        self._views: Dict[Path, Dict[str, str]] = {}
+        self._subtrees: Dict[Path, Set[str]] = {}
+
+    def view(self, path: Path) -> Dict[str, str]:
+        """``{dotted key: value}`` of ``path`` with this store's queued edits
+        applied.  Read-only for callers; it changes as edits are queued."""
+        path = Path(path).resolve()
+        if path not in self._views:
+            self._views[path] = dict(corpus.flat(path))
+        return self._views[path]
+
+    def _conflict(self, path: Path, key: str) -> Optional[str]:
+        view = self.view(path)
+        if path not in self._subtrees:
+            self._subtrees[path] = _prefixes(view)
+        if key in self._subtrees[path]:
+            return f"{key!r} holds a subtree"
+        dot = key.rfind(".")
+        while dot != -1:
+            if key[:dot] in view:
+                return f"{key[:dot]!r} is a leaf ({view[key[:dot]]!r})"
+            dot = key.rfind(".", 0, dot)
+        return None
+
+    def set(self, path: Path, key: str, value: str) -> bool:
+        """Queue ``key = value``; False, with a warning, on a structural
+        conflict (the existing value is kept)."""
+        path = Path(path).resolve()
+        clash = self._conflict(path, key)
+        if clash:
+            sys.stderr.write(
+                f"WARN: {path.name}: not setting {key!r}: {clash}\n"
+            )
+            return False
+        view = self.view(path)
+        if key not in view:
+            head = key.rfind(".")
+            while head != -1:
+                self._subtrees[path].add(key[:head])
+                head = key.rfind(".", 0, head)
+        view[key] = value
+        self._ops.setdefault(path, []).append((key, value))
+        return True
+
+    def requeue(self, path: Path, key: str, english: str) -> bool:
+        """Queue ``key`` for the next translation run (``[TODO] <english>``)."""
+        return self.set(path, key, TODO + english)
+
+    def delete(self, path: Path, key: str) -> None:
+        """Queue the removal of ``key`` and anything beneath it."""
+        path = Path(path).resolve()
+        corpus.apply_ops(self.view(path), [(key, None)])
+        self._subtrees.pop(path, None)
+        self._ops.setdefault(path, []).append((key, None))
+
+    def commit(self) -> List[Path]:
+        """Write (or, when deferring, journal) every queued edit.
+
+        Returns the files whose content changed, or that gained journal
+        entries.  The queue is empty afterwards.
+        """
+        ops, self._ops = self._ops, {}
+        self._views.clear()
+        self._subtrees.clear()
+        if corpus.deferring():
+            lines = [
+                json.dumps(
+                    {"file": str(path), "key": key, "value": value},
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for path, edits in ops.items()
+                for key, value in edits
+            ]
+            if lines:
+                corpus.JOURNAL.parent.mkdir(parents=True, exist_ok=True)
+                with corpus.JOURNAL.open("a", encoding="utf-8") as fh:
+                    fh.write("".join(lines))
+            return [path for path, edits in ops.items() if edits]
+        with profiling.phase("locale_store.write", items=len(ops)):
+            changed = [path for path, edits in ops.items() if write_document(path, edits)]
+        profiling.count("locale_store.files_written", len(changed))
+        return changed
+
+
+def flush() -> List[Path]:
+    """Apply the journal, one write per file, then remove it."""
+    try:
+        lines = corpus.JOURNAL.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    ops: Dict[Path, List[Tuple[str, Optional[str]]]] = {}
+    for line in lines:
+        if line.strip():
+            rec = json.loads(line)
+            ops.setdefault(Path(rec["file"]), []).append((rec["key"], rec["value"]))
+    changed = [path for path, edits in ops.items() if write_document(path, edits)]
+    corpus.JOURNAL.unlink()
+    return changed
+
+
+def verify(root: Path) -> int:
+    """Golden check of ``dumps``: each locale under ``root`` must round-trip
+    to its own bytes and to what ``json.dumps`` writes."""
+    failures = 0
+    for lang, path in corpus.locale_paths(root).items():
+        raw = path.read_bytes()
+        doc = json.loads(raw)
+        ours = dumps(doc).encode("utf-8")
+        stdlib = (json.dumps(doc, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+        if ours != stdlib:
+            print(f"FAIL: {lang}: serializer differs from json.dumps", file=sys.stderr)
+            failures += 1
+        elif ours != raw:
+            print(f"FAIL: {lang}: {path.name} is not in the locale format", file=sys.stderr)
+            failures += 1
+    if failures:
+        return 1
+    print(f"[OK] {len(corpus.locale_paths(root))} locale file(s) serialise byte-identically")
+    return 0
+
+
+def pending() -> Tuple[int, int]:
+    """``(unflushed edits, files they touch)`` in the journal."""
+    try:
+        lines = corpus.JOURNAL.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return 0, 0
+    records = [json.loads(line) for line in lines if line.strip()]
+    return len(records), len({rec["file"] for rec in records})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Apply or inspect the deferred locale-edit journal "
+        "(I18N_DEFER_WRITES=1)."
+    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument(
+        "--flush", action="store_true", help="write the journaled edits to the files"
+    )
+    mode.add_argument(
+        "--status", action="store_true", help="report unflushed edits"
+    )
+    mode.add_argument(
+        "--assert-empty",
+        action="store_true",
+        help="fail if an earlier deferred run left unflushed edits",
+    )
+    mode.add_argument(
+        "--verify",
+        action="store_true",
+        help="check the serializer reproduces every locale and json.dumps exactly",
+    )
+    args = parser.parse_args()
+    if args.verify:
+        return verify(LOCALES_DIR)
+    edits, files = pending()
+    if args.status:
+        print(f"{edits} unflushed edit(s) to {files} file(s) in {corpus.JOURNAL}")
+        return 0
+    if args.assert_empty:
+        if not edits:
+            return 0
+        # Replaying it now would lay those old edits over whatever the files
+        # have gained since, so a person has to decide.
+        print(
+            f"FAIL: {edits} unflushed edit(s) to {files} file(s) left in "
+            f"{corpus.JOURNAL} by an earlier deferred run.\n"
+            "  Apply them:    python3 scripts/i18n_locale_store.py --flush\n"
+            f"  Or drop them:  rm {corpus.JOURNAL}",
+            file=sys.stderr,
+        )
+        return 1
+    for path in flush():
+        print(f"wrote: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
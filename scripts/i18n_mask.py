@@ -0,0 +1,77 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Mask placeholders and markup out of a string before it is translated.
+
+WHY THIS EXISTS
+---------------
+Markup-bearing English went to the translation service verbatim:
+``<a href="https://..." target="_blank" rel="noopener">``, ``{{count}}``,
+``&mdash;``, ``<code>/etc/sysmanage-agent.yaml</code>``.  The model was paid,
+in tokens and GPU time, to copy all of it, and copying is what it is worst
+at: a dropped or rewritten tag is the commonest reason ``i18n_check_markup
+--requeue`` sends a translation back, and the commonest "fallback" the
+service reports.
+
+HOW
+---
+``mask`` replaces each protected span -- a whole ``<code>...</code>`` element
+or backtick span (commands and paths are not prose), a ``{{...}}`` / ``${...}``
+/ ``{...}`` / ``%s`` / ``%(name)s`` / ``$VAR`` placeholder, any other tag, an
+entity -- with a numbered token ``{0}``, ``{1}``, ... .  Braced names are
+what the service already keeps verbatim, so the model only sees prose plus
+short tokens it knows to leave alone.  The tokens may move; word order is the
+translation's business.
+
+``unmask`` puts the spans back and accepts the result only when every token
+came back exactly once and the tag signature (``i18n_check_markup.signature``)
+equals the English's.  Anything else returns None, and the caller re-sends
+that string unmasked, so masking can never leave a string worse off than
+sending it as-is.
+"""
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+from i18n_check_markup import signature  # noqa: E402
+
+# Longest alternatives first: a <code> element before its tags, {{x}} before {x}.
+PROTECTED = re.compile(
+    r"<code\b[^>]*>.*?</code>|`[^`\n]+`"
+    r"|\{\{.*?\}\}|\$\{[^}]+\}|\{[^{}]*\}"
+    r"|%\d+\$[sdfgex]|%\(\w+\)[sdfgexr]|%[sdfgexr%]|\$[A-Za-z_]\w*"
+    r"|</?[A-Za-z][^>]*>|&[a-zA-Z]+;|&#\d+;",
+    re.DOTALL,
+)
+_TOKEN = re.compile(r"\{(\d+)\}")
+
+
+def mask(text: str) -> Tuple[str, List[str]]:
+    """``(masked text, spans)``; spans[i] is what token ``{i}`` stands for."""
+    spans: List[str] = []
+
+    def token(match: re.Match) -> str:
+        spans.append(match.group(0))
+        return f"{{{len(spans) - 1}}}"
+
+    return PROTECTED.sub(token, text), spans
+
+
+def unmask(translation: str, spans: List[str], source: str) -> Optional[str]:
+    """``translation`` with its tokens restored, or None if a token was lost,
+    repeated or invented, or the markup no longer matches ``source``."""
+    if not spans:
+        return translation
+    found = [int(m.group(1)) for m in _TOKEN.finditer(translation)]
+    if sorted(found) != list(range(len(spans))):
+        return None
+    restored = _TOKEN.sub(lambda m: spans[int(m.group(1))], translation)
+    if signature(restored) != signature(source):
+        return None
+    return restored
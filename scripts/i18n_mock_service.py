@@ -0,0 +1,281 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Offline stand-in for the GPU translation service.
+
+WHY THIS EXISTS
+---------------
+``translate_i18n.py`` could only be exercised against the real service on
+the GPU box, so nothing measured the client -- batching, the keep-alive
+pipeline, the checkpoint, the locale writes -- and nothing would notice it
+getting slower.  This serves the two endpoints the client uses,
+``GET /health`` and ``POST /translate/batch``, on the local machine, with
+no model behind them.
+
+HOW
+---
+A "translation" is a deterministic pseudo-translation into the target's
+script: each ASCII letter maps to a letter of that script (accented Latin
+for the Latin-script locales), so ``i18n_strict.wrong_script`` and the
+translation memory accept the output.  Placeholders, tags, entities and
+backtick code spans are copied through untouched, so the markup gate
+passes too.  A string with no letters to map comes back unchanged with a
+``fallback`` status, as the real service reports one.
+
+Each batch waits ``--latency`` seconds plus ``--per-kchar`` seconds per
+1,000 characters, holding one of ``--slots`` GPU slots (the real service
+runs a fixed number of batches at once).  ``--fail-rate`` answers that
+share of batches with a 500 and ``--malformed-rate`` drops a result from
+the reply, drawn from a generator seeded by ``--seed``, so a run is
+reproducible.  A batch holding a ``--poison`` string is always answered
+with a 500, as the real service fails on the one string it chokes on.
+
+  python3 scripts/i18n_mock_service.py --port 8765 --latency 0.2
+  make translate SERVICE=http://localhost:8765
+
+``i18n_translate_bench.py`` starts one in-process through ``start``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+# Copied through verbatim: the spans the client masks (and, when it sends a
+# string unmasked, the placeholders and tags the real service keeps).
+from i18n_mask import PROTECTED  # noqa: E402
+
+MODEL = "mock-pseudo"
+
+_LATIN = "åƀçðéƒĝĥîĵķļɱñöþǫŕšţûṽŵẋýž"
+_ALPHABETS = {
+    "ar": "ابتثجحخدذرزسشصضطظعغفقكلمنهوي",
+    "hi": "".join(chr(c) for c in range(0x0915, 0x0915 + 26)),
+    "ru": "".join(chr(c) for c in range(0x0430, 0x0430 + 26)),
+    "ja": "".join(chr(c) for c in range(0x30A2, 0x30A2 + 52, 2)),
+    "ko": "".join(chr(0xAC00 + 588 * i) for i in range(19))
+    + "".join(chr(0xAC00 + 28 * i) for i in range(1, 8)),
+    "zh_CN": "".join(chr(c) for c in range(0x4E00, 0x4E00 + 26)),
+    "zh_TW": "".join(chr(c) for c in range(0x5000, 0x5000 + 26)),
+}
+
+
+def _table(lang: str) -> Dict[int, str]:
+    alphabet = _ALPHABETS.get(lang)
+    table = {}
+    for i in range(26):
+        lower, upper = chr(ord("a") + i), chr(ord("A") + i)
+        if alphabet is None:
+            table[ord(lower)] = _LATIN[i]
+            table[ord(upper)] = _LATIN[i].upper()
+        else:
+            table[ord(lower)] = table[ord(upper)] = alphabet[i]
+    return table
+
+
+_TABLES: Dict[str, Dict[int, str]] = {}
+
+
+def pseudo_translate(text: str, lang: str) -> Tuple[str, bool]:
+    """``(translation, ok)``: ``text`` with every letter outside a protected
+    token mapped into ``lang``'s script; not ok when nothing changed."""
+    table = _TABLES.get(lang)
+    if table is None:
+        table = _TABLES[lang] = _table(lang)
+    out: List[str] = []
+    pos = 0
+    for match in PROTECTED.finditer(text):
+        out.append(text[pos:match.start()].translate(table))
+        out.append(match.group(0))
+        pos = match.end()
+    out.append(text[pos:].translate(table))
+    result = "".join(out)
+    return result, result != text
+
+
+class MockService(ThreadingHTTPServer):
+    """The HTTP server plus its behaviour knobs and what it has served."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        latency: float = 0.0,
+        per_kchar: float = 0.0,
+        slots: int = 1,
+        fail_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+        poison: Iterable[str] = (),
+    ):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.per_kchar = per_kchar
+        self.slots = threading.BoundedSemaphore(max(1, slots))
+        self.fail_rate = fail_rate
+        self.malformed_rate = malformed_rate
+        self.poison = frozenset(poison)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.strings = 0
+        self.chars = 0
+        self.failed = 0
+        self.busy = 0.0  # seconds spent "on the GPU", summed over slots
+
+    def draw(self) -> Tuple[bool, bool]:
+        """(fail this batch, malformed reply), reproducibly."""
+        with self._lock:
+            return (
+                self._random.random() < self.fail_rate,
+                self._random.random() < self.malformed_rate,
+            )
+
+    def account(self, texts: List[str], seconds: float, failed: bool) -> None:
+        with self._lock:
+            self.batches += 1
+            self.busy += seconds
+            if failed:
+                self.failed += 1
+            else:
+                self.strings += len(texts)
+                self.chars += sum(map(len, texts))
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the client expects
+    server: MockService
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):  # noqa: N802 -- http.server's naming
+        if self.path.rstrip("/") == "/health":
+            self._reply(200, {"status": "ok", "model": MODEL})
+        else:
+            self._reply(404, {"detail": "not found"})
+
+    def do_POST(self):  # noqa: N802 -- http.server's naming
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.rstrip("/") != "/translate/batch":
+            self._reply(404, {"detail": "not found"})
+            return
+        try:
+            request = json.loads(body.decode("utf-8"))
+            texts, targets = request["texts"], request["targets"]
+        except (ValueError, KeyError, TypeError):
+            self._reply(422, {"detail": "expected {texts: [...], targets: [...]}"})
+            return
+        service = self.server
+        fail, malformed = service.draw()
+        fail = fail or not service.poison.isdisjoint(texts)
+        with service.slots:
+            start = time.monotonic()
+            delay = service.latency + service.per_kchar * sum(map(len, texts)) / 1000
+            if delay > 0:
+                time.sleep(delay)
+            results = []
+            for text in texts:
+                item = {"translations": {}, "status": {}}
+                for lang in targets:
+                    out, ok = pseudo_translate(text, lang)
+                    item["translations"][lang] = out
+                    item["status"][lang] = "ok" if ok else "fallback"
+                results.append(item)
+            service.account(texts, time.monotonic() - start, fail)
+        if fail:
+            self._reply(500, {"detail": "mock failure"})
+            return
+        if malformed and results:
+            results.pop()
+        self._reply(200, {"results": results})
+
+
+def start(host: str = "127.0.0.1", port: int = 0, **options) -> MockService:
+    """A mock service serving from a background thread (port 0 = any free
+    port; see ``.url``).  ``shutdown()`` stops it."""
+    service = MockService((host, port), **options)
+    threading.Thread(target=service.serve_forever, daemon=True).start()
+    return service
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Serve a pseudo-translating stand-in for the GPU translation service."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per batch (default 0)"
+    )
+    parser.add_argument(
+        "--per-kchar",
+        type=float,
+        default=0.0,
+        help="extra seconds per 1,000 characters in a batch (default 0)",
+    )
+    parser.add_argument(
+        "--slots", type=int, default=1, help="batches translated at once (default 1)"
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0, help="share of batches answered 500"
+    )
+    parser.add_argument(
+        "--malformed-rate",
+        type=float,
+        default=0.0,
+        help="share of replies missing a result",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--poison",
+        action="append",
+        default=[],
+        metavar="TEXT",
+        help="answer every batch holding TEXT with a 500 (repeatable)",
+    )
+    args = parser.parse_args()
+    service = MockService(
+        (args.host, args.port),
+        latency=args.latency,
+        per_kchar=args.per_kchar,
+        slots=args.slots,
+        fail_rate=args.fail_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+        poison=args.poison,
+    )
+    print(f"mock translation service on {service.url}", flush=True)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    service.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
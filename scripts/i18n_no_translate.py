@@ -78,3 +78,13 @@ def is_no_translate(
     per-language cognates).
     """
     return _allow().allows(dotted_key, en_value or "", lang)
+
+
+def no_translate_ids(keys, values, ids, lang: Optional[str] = None, scoped: bool = False) -> set:
+    """The IDs in ``ids`` flagged intentionally-English by the global rules, or
+    with ``scoped`` by the rules scoped to ``lang`` alone.
+
+    ``is_no_translate(keys[i], values[i], lang)`` is membership in either set;
+    see ``Allow.allowed_ids``.
+    """
+    return _allow().allowed_ids(keys, values, ids, lang, scoped)
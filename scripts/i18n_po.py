@@ -0,0 +1,255 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Index a gettext ``.po`` file once; read and requeue it from the index.
+
+WHY THIS EXISTS
+---------------
+``i18n_strict.read_po`` and the ``.po`` branch of its requeue each walked a
+catalog line by line with regexes, separately: the requeue re-collected every
+msgid's continuation lines to find the entries to empty and re-joined the
+whole file to write it, and ``i18n_check_markup`` re-read every catalog the
+strict gate had just read.  Fine for the handful of entries the gettext
+surfaces hold today, linear in the wrong things for a large catalog.
+
+HOW
+---
+``index`` makes one pass over a catalog's bytes and records, for every
+``msgid`` directly followed by a ``msgstr``, the unescaped msgid and msgstr
+and the byte span of the msgstr block (the directive plus its continuation
+lines).  The result is memoised per process and kept under
+``.i18n-cache/po/``, keyed by the file's ``(mtime_ns, size)``, so the gates
+that run back to back in ``make lint`` parse a catalog once between them.
+``I18N_CACHE=0`` bypasses the on-disk copy, as it does for the locale JSON.
+
+``requeue`` empties the msgstr of chosen msgids by splicing ``msgstr ""`` over
+their spans -- every other byte of the file is copied through untouched, line
+endings included.  ``python3 scripts/i18n_po.py --verify`` checks both
+against a golden sample catalog in LF and CRLF form (``make i18n-selftest``).
+
+The grammar is the one ``read_po`` always accepted: one-line ``msgid`` /
+``msgstr`` directives with ``"..."`` continuation lines.  ``msgctxt``, plural
+forms and comments end an entry and are otherwise skipped, as before.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+
+CACHE_DIR = corpus.CACHE_DIR / "po"
+# Bump when the cached layout changes; an old file then reads as a miss.
+_VERSION = 2
+
+_DIRECTIVE = re.compile(r'^(msgid|msgstr)\s+"(.*)"\s*$')
+_CONTINUATION = re.compile(r'^"(.*)"\s*$')
+
+
+def unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    return text.replace(r"\"", '"').replace(r"\n", "\n").replace(r"\\", "\\")
+
+
+class Entry(NamedTuple):
+    msgid: str
+    msgstr: str
+    start: int  # byte offset of the ``msgstr`` directive's line
+    end: int  # byte offset just past its last continuation line (before "\r\n"/"\n")
+
+
+def parse(data: bytes) -> List[Entry]:
+    """Every msgid/msgstr pair of a catalog, in file order."""
+    # "\n" is never part of a multi-byte UTF-8 sequence, so the text and the
+    # byte lines correspond one to one; the byte lengths give the offsets.
+    lines = [line.strip() for line in data.decode("utf-8").split("\n")]
+    lines.append("")  # a sentinel: every scan below stops on it
+    starts = list(accumulate((len(raw) + 1 for raw in data.split(b"\n")), initial=0))
+    directive, continuation = _DIRECTIVE.match, _CONTINUATION.match
+    entries: List[Entry] = []
+    i, count = 0, len(lines) - 1
+    while i < count:
+        head = directive(lines[i])
+        i += 1
+        if not head or head.group(1) != "msgid":
+            continue
+        buf = [head.group(2)]
+        more = continuation(lines[i])
+        while more:
+            buf.append(more.group(1))
+            i += 1
+            more = continuation(lines[i])
+        head = directive(lines[i])
+        if not head or head.group(1) != "msgstr":
+            continue
+        start = starts[i]
+        value = [head.group(2)]
+        i += 1
+        more = continuation(lines[i])
+        while more:
+            value.append(more.group(1))
+            i += 1
+            more = continuation(lines[i])
+        end = starts[i] - 1
+        if data[end - 1:end] == b"\r":
+            end -= 1  # a CRLF catalog: the splice must leave the "\r" in place
+        entries.append(Entry(unescape("".join(buf)), unescape("".join(value)), start, end))
+    return entries
+
+
+class Catalog:
+    """One indexed ``.po`` file."""
+
+    def __init__(self, path: Path, stamp: Tuple[int, int], entries: List[Entry]):
+        self.path = path
+        self.stamp = stamp
+        self.entries = entries
+        self._translations = None
+
+    def translations(self) -> Dict[str, str]:
+        """``{msgid: msgstr}`` for entries with a non-empty translation
+        (the header, msgid ``""``, excluded); a later duplicate wins."""
+        if self._translations is None:
+            found = {e.msgid: e.msgstr for e in self.entries if e.msgstr}
+            found.pop("", None)
+            self._translations = found
+        return self._translations
+
+    def msgids(self) -> Set[str]:
+        return {e.msgid for e in self.entries}
+
+    def requeue(self, msgids: Iterable[str]) -> Tuple[bytes, Set[str]]:
+        """``(new file bytes, msgids emptied)``: ``msgstr ""`` spliced over the
+        msgstr of every entry whose msgid is in ``msgids``."""
+        targets = set(msgids)
+        data = self.path.read_bytes()
+        if _stamp(self.path) != self.stamp:
+            return index(self.path).requeue(targets)
+        out, pos, seen = [], 0, set()
+        for entry in self.entries:
+            if entry.msgid in targets:
+                out.append(data[pos:entry.start])
+                out.append(b'msgstr ""')
+                pos = entry.end
+                seen.add(entry.msgid)
+        out.append(data[pos:])
+        return b"".join(out), seen
+
+
+# path -> Catalog, while its stamp holds.
+_MEMO: Dict[Path, Catalog] = {}
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _cache_path(path: Path) -> Path:
+    return CACHE_DIR / f"{path.stem}-{corpus.input_digest(str(path.resolve()))}.json"
+
+
+def _read_cache(path: Path, stamp: Tuple[int, int]):
+    try:
+        data = json.loads(_cache_path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != _VERSION or data.get("stamp") != list(stamp):
+        return None
+    try:
+        return [Entry(*row) for row in data["entries"]]
+    except (KeyError, TypeError):
+        return None
+
+
+def index(path: Path) -> Catalog:
+    """The ``Catalog`` of ``path``, parsed at most once per change."""
+    path = Path(path)
+    stamp = _stamp(path)
+    hit = _MEMO.get(path)
+    if hit is not None and hit.stamp == stamp:
+        return hit
+    entries = _read_cache(path, stamp) if corpus.cache_enabled() else None
+    if entries is None:
+        entries = parse(path.read_bytes())
+        if corpus.cache_enabled():
+            payload = {"version": _VERSION, "stamp": list(stamp), "entries": entries}
+            corpus.atomic_write(
+                _cache_path(path),
+                json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+                    "utf-8"
+                ),
+            )
+    catalog = _MEMO[path] = Catalog(path, stamp, entries)
+    return catalog
+
+
+# One of each shape ``parse`` accepts, for ``verify``.
+_SAMPLE = (
+    'msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n\n'
+    '#: page.html:1\nmsgid "Save"\nmsgstr "Speichern"\n\n'
+    'msgid ""\n"Split "\n"id"\nmsgstr ""\n"Geteilte "\n"ID"\n\n'
+    'msgctxt "menu"\nmsgid "Open"\nmsgstr "\\"Öffnen\\""\n\n'
+    'msgid "Close"\nmsgstr "Schließen"'
+)
+_REQUEUED = (
+    'msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n\n'
+    '#: page.html:1\nmsgid "Save"\nmsgstr ""\n\n'
+    'msgid ""\n"Split "\n"id"\nmsgstr ""\n\n'
+    'msgctxt "menu"\nmsgid "Open"\nmsgstr "\\"Öffnen\\""\n\n'
+    'msgid "Close"\nmsgstr ""'
+)
+
+
+def verify() -> int:
+    """Golden check of ``translations`` and ``requeue`` on a sample catalog,
+    with LF and CRLF line endings, with and without a final newline: every
+    byte the splice does not replace must come through untouched."""
+    expected = {"Save": "Speichern", "Split id": "Geteilte ID", "Open": '"Öffnen"',
+                "Close": "Schließen"}
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix="i18n-po-verify-") as tmp:
+        for name, eol in (("LF", "\n"), ("CRLF", "\r\n")):
+            for tail in ("", eol):
+                label = name + (", final newline" if tail else "")
+                path = Path(tmp) / f"{len(eol)}{len(tail)}.po"
+                path.write_bytes((_SAMPLE.replace("\n", eol) + tail).encode("utf-8"))
+                catalog = Catalog(path, _stamp(path), parse(path.read_bytes()))
+                data, seen = catalog.requeue({"Save", "Split id", "Close", "Absent"})
+                want = (_REQUEUED.replace("\n", eol) + tail).encode("utf-8")
+                if catalog.translations() != expected:
+                    print(f"FAIL: {label}: translations differ", file=sys.stderr)
+                    failures += 1
+                elif data != want or seen != {"Save", "Split id", "Close"}:
+                    print(f"FAIL: {label}: requeue output differs", file=sys.stderr)
+                    failures += 1
+    if failures:
+        return 1
+    print("[OK] .po index reads and requeues LF and CRLF catalogs byte-exactly")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="The .po index shared by the i18n gates.")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        required=True,
+        help="check reading and requeueing against a golden LF/CRLF sample",
+    )
+    parser.parse_args()
+    return verify()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
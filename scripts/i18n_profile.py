@@ -0,0 +1,222 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Opt-in per-phase timing and counters for the i18n scripts.
+
+WHY THIS EXISTS
+---------------
+When ``make lint`` got slower nobody could say where the time went -- JSON
+parsing, allow-list matching, script detection, file writes -- short of
+attaching a profiler to each gate by hand and reading call trees.  The
+questions are always the same few, so the scripts answer them themselves.
+
+HOW
+---
+Off unless asked for, and then nearly free: ``phase`` hands back a shared
+no-op context manager and ``count`` returns at once.  Turned on by
+``--profile [PATH]`` on ``i18n_strict.py``, ``i18n_check_markup.py``,
+``i18n_validate.py``, ``translate_i18n.py`` and ``i18n_autotag.py``, or for a
+whole ``make lint`` by ``I18N_PROFILE=1`` (or ``=<dir>``) in the environment.
+At exit the script writes a JSON report -- by default
+``.i18n-cache/profile/<script>.json`` -- and prints its phases to stderr:
+
+  * ``phases``: wall and CPU seconds, entries and items per named phase.
+    Phases nest and each one's time includes its children's.
+  * ``functions``: wall seconds and calls of the hot functions a script
+    registers with ``instrument`` (allow-list lookups, script detection),
+    which run far too often to wrap in a phase.
+  * ``counters``: item counts (values checked, cache hits, files written).
+  * the run's total wall/CPU seconds and peak RSS.
+
+The report has a stable shape and key order, so two of them diff cleanly
+between commits.  ``I18N_PROFILE_CPROFILE=1`` also saves a cProfile dump
+next to it (``<script>.prof``; read it with ``python3 -m pstats``).
+
+Only the process that called ``start`` reports: with ``--jobs`` the work done
+in worker processes shows up as the wall time of the phase around it, not in
+its counters.
+"""
+from __future__ import annotations
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not on Windows; the report just omits peak RSS
+    resource = None
+
+REPO = Path(__file__).resolve().parent.parent
+REPORT_DIR = REPO / ".i18n-cache" / "profile"
+ENV = "I18N_PROFILE"
+ENV_CPROFILE = "I18N_PROFILE_CPROFILE"
+
+_NULL = nullcontext()
+
+
+class _State:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.script = ""
+        self.report: Optional[Path] = None
+        self.pid = 0
+        self.start = (0.0, 0.0)
+        self.phases: Dict[str, List[float]] = {}  # name -> [wall, cpu, calls, items]
+        self.functions: Dict[str, List[float]] = {}  # name -> [wall, calls]
+        self.counters: Dict[str, int] = {}
+        self.cprofile: Optional[cProfile.Profile] = None
+
+
+_STATE = _State()
+
+
+def enabled() -> bool:
+    return _STATE.enabled
+
+
+def add_argument(parser) -> None:
+    """The ``--profile [PATH]`` option every instrumented script takes."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help=f"write per-phase timings and counters as JSON to PATH "
+        f"(default .i18n-cache/profile/<script>.json; or set {ENV}=1)",
+    )
+
+
+def _destination(script: str, option: Optional[str]) -> Optional[Path]:
+    if option is not None:
+        return Path(option) if option else REPORT_DIR / f"{script}.json"
+    env = os.environ.get(ENV, "")
+    if env in ("", "0"):
+        return None
+    return (REPORT_DIR if env == "1" else Path(env)) / f"{script}.json"
+
+
+def start(script: str, option: Optional[str] = None) -> None:
+    """Turn instrumentation on for this run if ``--profile`` (``option``) or
+    ``I18N_PROFILE`` asks for it; the report is written at exit."""
+    report = _destination(script, option)
+    if report is None or _STATE.enabled:
+        return
+    _STATE.enabled = True
+    _STATE.script = script
+    _STATE.report = report
+    _STATE.pid = os.getpid()
+    _STATE.start = (time.perf_counter(), time.process_time())
+    if os.environ.get(ENV_CPROFILE, "") not in ("", "0"):
+        _STATE.cprofile = cProfile.Profile()
+        _STATE.cprofile.enable()
+    atexit.register(_finish)
+
+
+def phase(name: str, items: int = 0):
+    """Context manager timing one phase (wall and CPU) under ``name``."""
+    if not _STATE.enabled:
+        return _NULL
+    return _phase(name, items)
+
+
+@contextmanager
+def _phase(name: str, items: int):
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        row = _STATE.phases.setdefault(name, [0.0, 0.0, 0, 0])
+        row[0] += time.perf_counter() - wall
+        row[1] += time.process_time() - cpu
+        row[2] += 1
+        row[3] += items
+
+
+def count(name: str, n: int = 1) -> None:
+    if _STATE.enabled:
+        _STATE.counters[name] = _STATE.counters.get(name, 0) + n
+
+
+def instrument(owner, *names: str, prefix: str = "") -> None:
+    """Time every call of ``owner.<name>`` (a module's function or a class's
+    method), for functions called too often to wrap in a ``phase``.
+
+    Does nothing unless profiling is on, so call it after ``start``.  Wall
+    time only: reading the CPU clock costs as much again per call.
+    """
+    if not _STATE.enabled:
+        return
+    for name in names:
+        fn = getattr(owner, name)
+        row = _STATE.functions.setdefault(prefix + name, [0.0, 0])
+
+        def timed(*args, _fn=fn, _row=row, **kwargs):
+            began = time.perf_counter()
+            try:
+                return _fn(*args, **kwargs)
+            finally:
+                _row[0] += time.perf_counter() - began
+                _row[1] += 1
+
+        setattr(owner, name, functools.wraps(fn)(timed))
+
+
+def _finish() -> None:
+    if not _STATE.enabled or os.getpid() != _STATE.pid:
+        return
+    wall = time.perf_counter() - _STATE.start[0]
+    cpu = time.process_time() - _STATE.start[1]
+    report = {
+        "script": _STATE.script,
+        "argv": sys.argv[1:],
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "peak_rss_kib": (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+        ),
+        "phases": {
+            name: {
+                "wall_seconds": round(row[0], 4),
+                "cpu_seconds": round(row[1], 4),
+                "calls": int(row[2]),
+                "items": int(row[3]),
+            }
+            for name, row in _STATE.phases.items()
+        },
+        "functions": {
+            name: {"wall_seconds": round(row[0], 4), "calls": int(row[1])}
+            for name, row in sorted(_STATE.functions.items())
+        },
+        "counters": dict(sorted(_STATE.counters.items())),
+    }
+    path = _STATE.report
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        if _STATE.cprofile is not None:
+            _STATE.cprofile.disable()
+            _STATE.cprofile.dump_stats(str(path.with_suffix(".prof")))
+    except OSError as exc:
+        print(f"profile: could not write {path}: {exc}", file=sys.stderr)
+        return
+    lines = [f"profile: {_STATE.script} {wall:.3f}s wall, {cpu:.3f}s CPU -> {path}"]
+    for name, row in report["phases"].items():
+        lines.append(
+            f"  {name:<32} {row['wall_seconds']:8.3f}s  x{row['calls']}"
+            + (f"  {row['items']} item(s)" if row["items"] else "")
+        )
+    for name, row in report["functions"].items():
+        lines.append(f"  {name + '()':<32} {row['wall_seconds']:8.3f}s  x{row['calls']}")
+    for name, value in report["counters"].items():
+        lines.append(f"  {name:<32} {value}")
+    print("\n".join(lines), file=sys.stderr)
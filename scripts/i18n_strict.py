@@ -44,20 +44,38 @@ Usage:
                                                 # reference for staleness
   python3 scripts/i18n_strict.py --requeue      # re-mark violations '[TODO] …'
                                                 # so `make translate` fills them
+  python3 scripts/i18n_strict.py --incremental  # re-check only values changed
+                                                # since the last run (make lint)
+  python3 scripts/i18n_strict.py --jobs 8       # one worker process per locale
+                                                # shard (0 = one per CPU)
+  python3 scripts/i18n_strict.py --verify       # script table vs unicodedata
 """
 
 from __future__ import annotations
 
 import argparse
 import fnmatch
+import functools
 import hashlib
 import json
+import os
 import re
 import sys
 import unicodedata
-from collections import OrderedDict
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# Parsed-once locale snapshots shared by every i18n gate; see i18n_corpus.
+import i18n_corpus as corpus  # noqa: E402
+# The staleness sidecar: JSON, or its sqlite store (I18N_HASH_STORE=sqlite).
+import i18n_hashes as source_hashes  # noqa: E402
+# Queued, write-once locale edits (journaled under I18N_DEFER_WRITES=1).
+import i18n_locale_store as locale_store  # noqa: E402
+# gettext catalogs, indexed once with each entry's byte span.
+import i18n_po as po_index  # noqa: E402
+# Opt-in per-phase timings (--profile / I18N_PROFILE).
+import i18n_profile as profiling  # noqa: E402
+
 REPO = Path(__file__).resolve().parent.parent
 ALLOW_FILE = REPO / "i18n-allow.txt"
 
@@ -181,25 +199,55 @@ _SCRIPT_TAGS = (
 )
 
 
-def scripts_used(text: str) -> set:
+_NO_SCRIPT = 1  # classified: not a letter, unnamed, or no tag applies
+# Per-codepoint script id: 0 = not classified yet, _NO_SCRIPT, or 2 + the index
+# of the tag in _SCRIPT_TAGS.  Filled lazily from ``_classify_char``, which IS
+# the rule -- so the table cannot disagree with it, whatever the Unicode
+# version -- and each codepoint costs one ``unicodedata.name`` call per
+# process instead of one per occurrence.  The corpus uses a few thousand
+# distinct characters; it holds tens of millions of them.
+_SCRIPT_OF = bytearray(0x110000)
+# text -> frozenset of scripts.  English values are asked about once per
+# locale, and short labels repeat across thousands of keys.
+_SCRIPTS_MEMO: dict[str, frozenset] = {}
+
+
+def _classify_char(ch: str) -> int:
+    if not ch.isalpha():
+        return _NO_SCRIPT
+    try:
+        name = unicodedata.name(ch)
+    except ValueError:
+        return _NO_SCRIPT
+    for idx, tag in enumerate(_SCRIPT_TAGS):
+        if name.startswith(tag) or tag in name.split()[0:2]:
+            return idx + 2
+    return _NO_SCRIPT
+
+
+def scripts_used(text: str) -> frozenset:
     """Unicode scripts present in ``text``, ignoring Latin.
 
     Latin is excluded because every locale legitimately carries product names,
     CLI snippets and acronyms in Latin script.
+
+    Each DISTINCT character is classified once, through the ``_SCRIPT_OF``
+    table; ``set(text)`` does the per-character pass in C.
     """
-    found = set()
-    for ch in text:
-        if not ch.isalpha():
-            continue
-        try:
-            name = unicodedata.name(ch)
-        except ValueError:
-            continue
-        for tag in _SCRIPT_TAGS:
-            if name.startswith(tag) or tag in name.split()[0:2]:
-                found.add(tag)
-                break
-    return found - {"LATIN"}
+    found = _SCRIPTS_MEMO.get(text)
+    if found is not None:
+        return found
+    table = _SCRIPT_OF
+    ids = set()
+    for ch in set(text):
+        sid = table[ord(ch)]
+        if not sid:
+            sid = table[ord(ch)] = _classify_char(ch)
+        ids.add(sid)
+    ids.discard(_NO_SCRIPT)
+    found = frozenset(_SCRIPT_TAGS[i - 2] for i in ids) - {"LATIN"}
+    _SCRIPTS_MEMO[text] = found
+    return found
 
 
 def wrong_script(lang: str, text: str, source: str = None) -> bool:
@@ -244,6 +292,89 @@ def digest(text: str) -> str:
 # --------------------------------------------------------------------------
 
 
+# A glob metacharacter; everything before the first one is the rule's literal
+# prefix.  A rule with none is an exact key.
+_GLOB_META = re.compile(r"[*?[]")
+# Constructs that stop a value regex being spliced into a shared alternation:
+# back-references and conditionals count groups, and group names must be
+# unique across the whole merged pattern.
+_UNMERGEABLE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(")
+_DEFAULT_FLAGS = re.compile("").flags
+
+
+class _CompiledRules:
+    """One group of allow-list rules, indexed so a lookup is not a rule scan.
+
+    ``Allow.allows`` used to walk every key glob with ``fnmatch`` and every
+    value regex with ``fullmatch`` in Python, for each of the ~250k (locale,
+    key) pairs the gates ask about, re-testing each rule's scope every time.
+    Here that work is done once per distinct rule set:
+
+      * exact keys (no glob metacharacter) are a set lookup;
+      * globs are bucketed by their literal prefix, so a key is only tested
+        against globs whose prefix it actually starts with;
+      * value regexes are spliced into ONE alternation, each in a named group
+        (``m.lastgroup`` names the rule that matched), so the scan over them
+        runs inside the regex engine.  A regex that cannot be spliced safely
+        (back-references, inline global flags) is kept and tried separately.
+
+    Answers for values are memoised -- English repeats heavily across keys.
+    ``Allow`` keeps one of these for the unscoped rules, shared by every
+    locale, and one per locale for its scoped extras.
+    """
+
+    def __init__(self, keys, values):
+        self.exact = set()
+        self.globs: dict[str, list[re.Pattern]] = {}
+        for glob in keys:
+            glob = os.path.normcase(glob)  # what fnmatch.fnmatch does
+            literal = _GLOB_META.split(glob, 1)[0]
+            if literal == glob:
+                self.exact.add(glob)
+            else:
+                self.globs.setdefault(literal, []).append(
+                    re.compile(fnmatch.translate(glob))
+                )
+        self.prefix_lens = sorted({len(p) for p in self.globs})
+
+        spliced, self.separate = [], []
+        for idx, pat in values:
+            if pat.flags == _DEFAULT_FLAGS and not _UNMERGEABLE.search(pat.pattern):
+                spliced.append(f"(?P<r{idx}>{pat.pattern})")
+            else:
+                self.separate.append(pat)
+        self.merged = None
+        if spliced:
+            try:
+                self.merged = re.compile("|".join(spliced))
+            except re.error:
+                self.separate = [pat for _idx, pat in values]
+        self.memo: dict[str, bool] = {}
+
+    def key_allowed(self, key: str) -> bool:
+        key = os.path.normcase(key)
+        if key in self.exact:
+            return True
+        for n in self.prefix_lens:
+            bucket = self.globs.get(key[:n])
+            if bucket and any(p.match(key) for p in bucket):
+                return True
+        return False
+
+    def value_allowed(self, value: str) -> bool:
+        if self.merged is None and not self.separate:
+            return False
+        hit = self.memo.get(value)
+        if hit is None:
+            text = value.strip()
+            hit = bool(
+                (self.merged is not None and self.merged.fullmatch(text))
+                or any(p.fullmatch(text) for p in self.separate)
+            )
+            self.memo[value] = hit
+        return hit
+
+
 class Allow:
     """Key globs + value regexes that may legitimately stay English.
 
@@ -265,6 +396,8 @@ class Allow:
         # None = applies to every locale; otherwise a set of locale names.
         self.keys: list[tuple[object, str]] = []
         self.values: list[tuple[object, re.Pattern]] = []
+        self._by_lang: dict = {}
+        self._global = None
         if not path.exists():
             return
         bad = []
@@ -298,11 +431,41 @@ class Allow:
                 f"i18n allow-list has {len(bad)} unusable rule(s):\n" + "\n  ".join(bad)
             )
 
-    def allows(self, key: str, value: str, lang: str = None) -> bool:
-        def live(scope):
-            return scope is None or lang is None or lang in scope
+    def _rules(self, lang):
+        """``(global, scoped)`` compiled rule sets live for ``lang``.
+
+        Unscoped rules are compiled once and shared by every locale, memo
+        included, so a value is tested against them once per run rather than
+        once per locale; only the few scoped rules are compiled per locale.
+        ``lang=None`` means every rule, scoped or not, as it always has.
+        """
+        rules = self._by_lang.get(lang)
+        if rules is None:
+
+            def pick(rows, scoped):
+                return [
+                    (i, rule)
+                    for i, (scope, rule) in enumerate(rows)
+                    if (scope is not None) == scoped
+                    and (scope is None or lang is None or lang in scope)
+                ]
+
+            if self._global is None:
+                self._global = _CompiledRules(
+                    [k for _i, k in pick(self.keys, False)], pick(self.values, False)
+                )
+            rules = (
+                self._global,
+                _CompiledRules(
+                    [k for _i, k in pick(self.keys, True)], pick(self.values, True)
+                ),
+            )
+            self._by_lang[lang] = rules
+        return rules
 
-        if any(live(s) and fnmatch.fnmatch(key, k) for s, k in self.keys):
+    def allows(self, key: str, value: str, lang: str = None) -> bool:
+        rules = self._rules(lang)
+        if any(r.key_allowed(key) for r in rules):
             return True
         # fullmatch, NOT search.  "This value is untranslatable" means the WHOLE
         # value is a path/URL/identifier — not that a sentence happens to
@@ -311,7 +474,19 @@ class Allow:
         # which is precisely the "broad rule swallows the prose next to it"
         # failure this file's own header warns about.  A rule that really wants
         # substring semantics can say so with an explicit `.*`.
-        return any(live(s) and p.fullmatch(value.strip()) for s, p in self.values)
+        return any(r.value_allowed(value) for r in rules)
+
+    def allowed_ids(self, keys, values, ids, lang: str = None, scoped: bool = False) -> set:
+        """The IDs ``i`` in ``ids`` whose ``(keys[i], values[i])`` the unscoped
+        rules allow -- or, with ``scoped``, that only ``lang``'s scoped rules do.
+
+        ``allows(keys[i], values[i], lang)`` is the union of the two, so a
+        caller holding one English column for many locales tests the unscoped
+        rules once and just each locale's few scoped ones per locale.
+        """
+        rules = self._rules(lang)[1 if scoped else 0]
+        key_ok, value_ok = rules.key_allowed, rules.value_allowed
+        return {i for i in ids if key_ok(keys[i]) or value_ok(values[i] or "")}
 
 
 # --------------------------------------------------------------------------
@@ -320,82 +495,25 @@ class Allow:
 
 
 def flatten(node, prefix=""):
-    out = {}
-    if isinstance(node, dict):
-        for key, val in node.items():
-            out.update(flatten(val, f"{prefix}{key}." if prefix else f"{key}."))
-    elif isinstance(node, str):
-        out[prefix.rstrip(".")] = node
-    return out
+    return corpus.flatten(node, prefix)
 
 
 def json_locales(surface):
-    """{lang: (path, {key: value})} for a locales directory."""
-    root, fname = surface["root"], surface.get("file")
-    out = {}
-    if not root.is_dir():
-        return out
-    for entry in sorted(root.iterdir()):
-        # Two shapes in the wild: <lang>/translation.json (apps) and
-        # <lang>.json (docs).  A leading dot is ours (the hash sidecar).
-        if entry.is_dir() and fname:
-            path = entry / fname
-            if path.exists():
-                out[entry.name] = (
-                    path,
-                    flatten(json.loads(path.read_text(encoding="utf-8"))),
-                )
-        elif (
-            entry.is_file()
-            and entry.suffix == ".json"
-            and not entry.name.startswith(".")
-        ):
-            out[entry.stem] = (
-                path := entry,
-                flatten(json.loads(path.read_text(encoding="utf-8"))),
-            )
-    return out
-
-
-_PO_DIRECTIVE = re.compile(r'^(msgid|msgstr)\s+"(.*)"\s*$')
-_PO_CONTINUATION = re.compile(r'^"(.*)"\s*$')
+    """{lang: (path, {key: value})} for a locales directory.
 
-
-def po_unescape(text: str) -> str:
-    return text.replace(r"\"", '"').replace(r"\n", "\n").replace(r"\\", "\\")
+    Served from the shared corpus cache, so the gates that run back to back
+    in ``make lint`` parse each locale once between them, not once each.
+    """
+    return corpus.json_locales(surface["root"], surface.get("file"))
 
 
 def read_po(path: Path):
-    """{msgid: msgstr} for entries with a non-empty translation."""
-    entries, key, buf, field = {}, None, [], None
-
-    def flush():
-        if field == "msgstr" and key:
-            value = po_unescape("".join(buf))
-            if value:
-                entries[key] = value
-
-    for raw in path.read_text(encoding="utf-8").split("\n"):
-        line = raw.strip()
-        directive = _PO_DIRECTIVE.match(line)
-        if directive:
-            name, first = directive.groups()
-            if name == "msgid":
-                flush()
-                field, buf = "msgid", [first]
-            else:
-                key = po_unescape("".join(buf))
-                field, buf = "msgstr", [first]
-            continue
-        continuation = _PO_CONTINUATION.match(line)
-        if continuation and field:
-            buf.append(continuation.group(1))
-            continue
-        flush()
-        field, buf = None, []
-    flush()
-    entries.pop("", None)
-    return entries
+    """{msgid: msgstr} for entries with a non-empty translation.
+
+    Served from ``i18n_po``'s index, so a catalog is parsed once between
+    this gate and ``i18n_check_markup``.
+    """
+    return po_index.index(path).translations()
 
 
 def po_files(surface):
@@ -416,7 +534,99 @@ def po_files(surface):
 # --------------------------------------------------------------------------
 
 
-def check_json(surface, allow, hashes):
+# Verdicts for one (locale, key), as cached by --incremental.  STALE is not
+# cached: it depends on the hash sidecar, which moves independently of the two
+# values, so it is re-tested on every run (a dict lookup and one digest).
+_WRONG, _ALLOWED, _ENGLISH, _CLEAN = "wrong", "allowed", "english", ""
+_STALE = "stale"
+
+
+def classify_json(lang, key, value, src, allow):
+    """The verdict for one non-empty, non-queued JSON value."""
+    # Script check FIRST and source-aware: "may stay English" must not
+    # mean "may be in any language at all".
+    if is_placeholder(value) and not is_placeholder(src):
+        # Same remedy as wrong-language: it is not a translation at all.
+        return _WRONG
+    if wrong_script(lang, value, src):
+        return _WRONG
+    if allow.allows(key, src, lang):
+        return _ALLOWED
+    if value == src and is_prose(src):
+        return _ENGLISH
+    return _CLEAN
+
+
+def verdict_revision():
+    """Everything besides the two values that can change a verdict.
+
+    The allow-list, this file (the checks themselves) and the Unicode database
+    that ``wrong_script`` classifies with.  Any change drops every cached
+    verdict, i.e. falls back to a full run.
+    """
+    return corpus.revision(ALLOW_FILE, Path(__file__), unicodedata.unidata_version)
+
+
+def check_json_locale(name, lang, path, en_path, allow, stale, rev=None):
+    """``[(verdict, key)]`` violations for one locale, in file order.
+
+    The unit of work ``--jobs`` hands to a worker process, so it takes paths
+    rather than parsed dicts and returns bare keys: both directions cross a
+    process boundary, and the caller already holds everything else a row
+    needs.  ``stale`` is the keys whose English changed since they were
+    translated (``stale_keys``).  ``rev`` set means incremental (see
+    ``check_json``).
+    """
+    table = corpus.key_table(en_path)
+    loc = corpus.flat(path)
+    src_col = table.column(corpus.flat(en_path))
+    loc_col = table.column(loc)
+    cache = (
+        corpus.VerdictCache(f"strict-{name}-{lang}", rev)
+        if rev is not None
+        else None
+    )
+    found, checked = [], 0
+    # Keys English lacks are outside the table, so never visited.
+    for i in table.order(loc):
+        key, value, src = table.keys[i], loc_col[i], src_col[i]
+        if value.startswith(TODO) or not value.strip():
+            continue  # already queued — the completeness gate owns these
+        checked += 1
+        if cache is None:
+            verdict = classify_json(lang, key, value, src, allow)
+        else:
+            inputs = corpus.input_digest(src, value)
+            verdict = cache.get(key, inputs)
+            if verdict is None:
+                verdict = classify_json(lang, key, value, src, allow)
+                cache.put(key, inputs, verdict)
+        if verdict == _CLEAN and key in stale:
+            verdict = _STALE
+        if verdict in (_WRONG, _ENGLISH, _STALE):
+            found.append((verdict, key))
+    profiling.count("strict.values_checked", checked)
+    if cache is not None:
+        profiling.count("strict.verdict_cache_hits", cache.hits)
+        cache.retain(loc)
+        cache.save()
+    return found
+
+
+def stale_keys(en, hashes):
+    """Keys whose English no longer matches the hash it was translated from.
+
+    Staleness depends on English alone, so it is decided once here rather
+    than re-hashing every English value once per locale.
+    """
+    return frozenset(
+        key
+        for key, recorded in hashes.items()
+        if key in en and recorded != digest(en[key])
+    )
+
+
+def check_json(surface, allow, hashes, incremental=False, jobs=1):
     """(english, stale, wrong) violation lists for one JSON surface.
 
     All three returns are 3-tuples.  This one used to return a 2-tuple, which
@@ -424,44 +634,33 @@ def check_json(surface, allow, hashes):
     an ``en`` locale crashed the whole gate with a ValueError instead of being
     skipped.  (``check_po`` returns TWO by design — a .po msgid IS the English,
     so a .po translation cannot go stale.)
+
+    ``incremental`` reuses the previous run's verdict for every (locale, key)
+    whose English and locale values are unchanged, so a commit that touched
+    one string re-checks one string per locale.  Results are identical to a
+    full run; see ``verdict_revision`` for what invalidates the cache.
+
+    ``jobs`` > 1 checks the locales in that many worker processes; the rows
+    are merged back in locale order, so the report is the same either way.
     """
-    locales = json_locales(surface)
-    if EN not in locales:
+    paths = corpus.locale_paths(surface["root"], surface.get("file"))
+    if EN not in paths:
         return [], [], []
-    _, en = locales[EN]
-    english, stale, wrong = [], [], []
-    for lang, (path, loc) in sorted(locales.items()):
-        if lang == EN:
-            continue
-        for key, value in loc.items():
-            src = en.get(key)
-            if src is None or value.startswith(TODO) or not value.strip():
-                continue  # absent / already queued — the completeness gate owns these
-            # The allow-list is consulted FIRST, including for wrong-script.
-            # It has to be: a language picker legitimately renders native
-            # names ("ko - 한국어") in every locale, and with the script check
-            # ahead of it there would be no way to say so.  The safety comes
-            # from the rules being whole-value (fullmatch) and tight, not from
-            # denying the escape hatch.
-            # Script check FIRST and source-aware: "may stay English" must not
-            # mean "may be in any language at all".
-            if is_placeholder(value) and not is_placeholder(src):
-                # Same remedy as wrong-language: it is not a translation at all.
-                wrong.append((surface["name"], lang, path, key, src))
-                continue
-            if wrong_script(lang, value, src):
-                wrong.append((surface["name"], lang, path, key, src))
-                continue
-            if allow.allows(key, src, lang):
-                continue
-            if wrong_script(lang, value, src):
-                wrong.append((surface["name"], lang, path, key, src))
-                continue
-            if value == src and is_prose(src):
-                english.append((surface["name"], lang, path, key, src))
-            elif key in hashes and hashes[key] != digest(src):
-                stale.append((surface["name"], lang, path, key, src))
-    return english, stale, wrong
+    rev = verdict_revision() if incremental else None
+    en = corpus.flat(paths[EN])
+    stale = stale_keys(en, hashes)
+    shards = [
+        (surface["name"], lang, path, paths[EN], allow, stale, rev)
+        for lang, path in paths.items()
+        if lang != EN
+    ]
+    out = {_ENGLISH: [], _STALE: [], _WRONG: []}
+    for (_name, lang, path, *_rest), found in zip(
+        shards, corpus.map_sharded(check_json_locale, shards, jobs)
+    ):
+        for verdict, key in found:
+            out[verdict].append((surface["name"], lang, path, key, en[key]))
+    return out[_ENGLISH], out[_STALE], out[_WRONG]
 
 
 def check_po(surface, allow):
@@ -478,22 +677,21 @@ def check_po(surface, allow):
     return english, wrong
 
 
-def gather(allow):
+def gather(allow, incremental=False, jobs=1):
     english, stale, wrong = [], [], []
     for surface in SURFACES:
-        if surface["kind"] == "po":
-            e, w = check_po(surface, allow)
-            english += e
-            wrong += w
-        else:
-            hashes = {}
-            hp = surface.get("hashes")
-            if hp and hp.exists():
-                hashes = json.loads(hp.read_text(encoding="utf-8"))
-            e, s, w = check_json(surface, allow, hashes)
-            english += e
-            stale += s
-            wrong += w
+        with profiling.phase(f"strict.gather.{surface['name']}"):
+            if surface["kind"] == "po":
+                e, w = check_po(surface, allow)
+                english += e
+                wrong += w
+            else:
+                hp = surface.get("hashes")
+                hashes = source_hashes.read(hp) if hp else {}
+                e, s, w = check_json(surface, allow, hashes, incremental, jobs)
+                english += e
+                stale += s
+                wrong += w
     return english, stale, wrong
 
 
@@ -512,19 +710,112 @@ def do_baseline():
         if EN not in locales:
             continue
         _, en = locales[EN]
-        hp.write_text(
-            json.dumps({k: digest(v) for k, v in sorted(en.items())}, indent=2) + "\n",
-            encoding="utf-8",
-        )
+        source_hashes.write_all(hp, {k: digest(v) for k, v in en.items()})
         print(f"  baselined {surface['name']:<10} {len(en)} key(s) -> {hp.name}")
     return 0
 
 
-def _set_nested(tree, dotted, value):
-    parts = dotted.split(".")
-    for part in parts[:-1]:
-        tree = tree[part]
-    tree[parts[-1]] = value
+@functools.lru_cache(maxsize=None)
+def _script_by_name(ch: str):
+    if not ch.isalpha():
+        return None
+    try:
+        name = unicodedata.name(ch)
+    except ValueError:
+        return None
+    return next((t for t in _SCRIPT_TAGS if name.startswith(t) or t in name.split()[:2]), None)
+
+
+def _scripts_by_name(text: str) -> set:
+    """``scripts_used`` without the table or the memo: ``unicodedata`` on
+    every character, the classifier as it was before either existed (cached
+    per character only so the check runs in seconds)."""
+    return set(map(_script_by_name, text)) - {None, "LATIN"}
+
+
+def do_verify():
+    """``scripts_used`` (cold, then memoised) against ``_scripts_by_name`` for
+    every value of every locale, English included, of every surface."""
+    values = set()
+    for surface in SURFACES:
+        if surface["kind"] == "po":
+            for _lang, path in po_files(surface):
+                values.update(*read_po(path).items())  # msgids and msgstrs
+        else:
+            for _path, flat in json_locales(surface).values():
+                values.update(flat.values())
+    bad = [v for v in values if not scripts_used(v) == scripts_used(v) == _scripts_by_name(v)]
+    for value in bad[:8]:
+        print(f"  {value[:60]!r}: {sorted(_scripts_by_name(value))}", file=sys.stderr)
+    if bad:
+        print(f"FAIL: {len(bad)} value(s) classified differently", file=sys.stderr)
+        return 1
+    print(f"[OK] script table matches unicodedata on {len(values)} distinct value(s)")
+    return 0
+
+
+class _Requeue:
+    """Requeue edits held in memory until ``write`` (JSON on a store, .po as lines)."""
+
+    def __init__(self):
+        self.store = locale_store.LocaleStore()
+        self.po_targets = {}  # path -> msgids to requeue
+        self.emptied = {}  # path -> those of them the catalog has
+
+    def queue(self, rows):
+        """Re-mark every ``(surface, lang, path, key, src)`` row; the count."""
+        by_path = {}
+        for _s, _lang, path, key, src in rows:
+            by_path.setdefault(path, []).append((key, src))
+        total = 0
+        for path, items in sorted(by_path.items()):
+            if path.suffix == ".po":
+                # Key on the MSGID, not the msgstr.  Matching the msgstr only
+                # works when it happens to equal the msgid (the English-identical
+                # case) and silently does nothing for a wrong-language entry,
+                # whose msgstr is the very text being replaced — that bug left
+                # 21 Arabic entries holding Chinese while reporting "converged".
+                targets = {key for key, _src in items}
+                seen = targets & po_index.index(path).msgids()
+                self.po_targets.setdefault(path, set()).update(targets)
+                self.emptied.setdefault(path, set()).update(seen)
+                total += len(seen)
+            else:
+                for key, src in items:
+                    self.store.requeue(path, key, src)
+                    total += 1
+        return total
+
+    def recheck(self, found, allow, stale):
+        """``(english, stale, wrong)``: which rows of ``found`` -- the same
+        triple -- still violate, judged on the edited values.  ``stale`` is
+        the identities reported stale; staleness depends only on English and
+        the sidecar, and a requeue changes neither."""
+        out = {_ENGLISH: [], _STALE: [], _WRONG: []}
+        for was, rows in zip((_ENGLISH, _STALE, _WRONG), found):
+            for row in rows:
+                surface, lang, path, key, src = row
+                if path.suffix == ".po":
+                    if key not in self.emptied.get(path, ()):
+                        out[was].append(row)  # no such msgid: nothing changed
+                    continue
+                value = self.store.view(path).get(key)
+                if value is None or value.startswith(TODO) or not value.strip():
+                    continue
+                verdict = classify_json(lang, key, value, src, allow)
+                if verdict == _CLEAN and (surface, lang, key) in stale:
+                    verdict = _STALE
+                if verdict in out:
+                    out[verdict].append(row)
+        return out[_ENGLISH], out[_STALE], out[_WRONG]
+
+    def write(self):
+        """Write every touched file once."""
+        self.store.commit()
+        for path, targets in sorted(self.po_targets.items()):
+            if self.emptied.get(path):
+                data, _seen = po_index.index(path).requeue(targets)
+                path.write_bytes(data)
 
 
 def do_requeue(english, stale):
@@ -533,62 +824,35 @@ def do_requeue(english, stale):
     That prefix is the only state ``make translate`` acts on, so this is what
     converts "silently wrong" into "queued for the next translation run".
     """
-    by_path = {}
-    for _s, _lang, path, key, src in english + stale:
-        by_path.setdefault(path, []).append((key, src))
+    edits = _Requeue()
+    total = edits.queue(english + stale)
+    edits.write()
+    return total
 
+
+def requeue_until_clean(allow, english, stale, wrong, rounds=6):
+    """``(queued, (english, stale, wrong) left)`` after requeueing to a fixpoint.
+
+    Each round used to write every affected locale and re-``gather`` the whole
+    corpus.  The edits are now held in memory, each round re-checks only the
+    keys it touched — nothing else changes between rounds — and every file is
+    written once, after the last round, whether or not it converged.
+    """
+    edits = _Requeue()
+    stale_ids = {_lang_identity(row) for row in stale}
     total = 0
-    for path, items in sorted(by_path.items()):
-        if path.suffix == ".po":
-            # Key on the MSGID, not the msgstr.  Matching the msgstr only
-            # works when it happens to equal the msgid (the English-identical
-            # case) and silently does nothing for a wrong-language entry,
-            # whose msgstr is the very text being replaced — that bug left 21
-            # Arabic entries holding Chinese while reporting "converged".
-            # Line-wise because gettext wraps long entries across
-            # continuation lines.
-            targets = {key for key, _src in items}
-            lines = path.read_text(encoding="utf-8").split("\n")
-            out, i, seen = [], 0, set()
-            while i < len(lines):
-                directive = _PO_DIRECTIVE.match(lines[i].strip())
-                if directive and directive.group(1) == "msgid":
-                    buf, j = [directive.group(2)], i + 1
-                    while j < len(lines) and _PO_CONTINUATION.match(lines[j].strip()):
-                        buf.append(_PO_CONTINUATION.match(lines[j].strip()).group(1))
-                        j += 1
-                    msgid = po_unescape("".join(buf))
-                    out.extend(lines[i:j])
-                    i = j
-                    if msgid in targets and i < len(lines):
-                        # Replace this entry's whole msgstr block with an empty
-                        # one so the completeness gate sees a gap to refill.
-                        d2 = _PO_DIRECTIVE.match(lines[i].strip())
-                        if d2 and d2.group(1) == "msgstr":
-                            k = i + 1
-                            while k < len(lines) and _PO_CONTINUATION.match(
-                                lines[k].strip()
-                            ):
-                                k += 1
-                            out.append('msgstr ""')
-                            seen.add(msgid)
-                            i = k
-                    continue
-                out.append(lines[i])
-                i += 1
-            path.write_text("\n".join(out), encoding="utf-8")
-            total += len(seen)
-        else:
-            doc = json.loads(
-                path.read_text(encoding="utf-8"), object_pairs_hook=OrderedDict
-            )
-            for key, src in items:
-                _set_nested(doc, key, TODO + src)
-                total += 1
-            path.write_text(
-                json.dumps(doc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-            )
-    return total
+    for _round in range(rounds):
+        # ``wrong`` MUST be in both the loop condition and the call.  It was
+        # omitted from each at first, so the loop exited immediately and
+        # reported "converged; 0 queued" while 21 wrong-language entries
+        # sat untouched — a requeue that silently does nothing is exactly
+        # the failure this loop exists to prevent.
+        if not (english or stale or wrong):
+            break
+        total += edits.queue(english + wrong + stale)
+        english, stale, wrong = edits.recheck((english, stale, wrong), allow, stale_ids)
+    edits.write()
+    return total, (english, stale, wrong)
 
 
 def main() -> int:
@@ -598,13 +862,44 @@ def main() -> int:
     parser.add_argument("--language-baseline", action="store_true")
     parser.add_argument("--prune-language", action="store_true")
     parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="check the script table against unicodedata over every value",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reuse cached verdicts for values unchanged since the last run",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="check locales in N worker processes (0 = one per CPU)",
+    )
+    profiling.add_argument(parser)
     args = parser.parse_args()
+    profiling.start("i18n_strict", args.profile)
+    # Per-call times of the hot checks; a no-op unless profiling.
+    profiling.instrument(
+        sys.modules[__name__], "wrong_script", "is_placeholder", "is_prose", prefix="strict."
+    )
+    profiling.instrument(Allow, "allows", prefix="strict.Allow.")
 
     if args.baseline:
         return do_baseline()
-
-    allow = Allow(ALLOW_FILE)
-    english, stale, wrong = gather(allow)
+    if args.verify:
+        return do_verify()
+
+    with profiling.phase("strict.allow_list"):
+        allow = Allow(ALLOW_FILE)
+    try:
+        with profiling.phase("strict.gather"):
+            english, stale, wrong = gather(allow, args.incremental, args.jobs)
+    except source_hashes.HashStoreConflict as exc:
+        print(f"FAIL: {exc}", file=sys.stderr)
+        return 1
 
     known_wrong = load_lang_baseline()
     current_wrong = {_lang_identity(r) for r in wrong}
@@ -635,23 +930,11 @@ def main() -> int:
     # Wrong-language content is requeued too: it is not a translation at all,
     # so the only fix is to ask the service again.
     if args.requeue:
-        # Loop until the gate is clean.  A single pass is NOT guaranteed to
-        # converge: re-reading a rewritten file can surface values the first
-        # gather did not report, and a requeue that silently leaves violations
-        # behind is worse than useless — it reports success and the overnight
-        # translation run then misses them.
-        total = 0
-        for _round in range(6):
-            # ``wrong`` MUST be in both the loop condition and the call.  It was
-            # omitted from each at first, so the loop exited immediately and
-            # reported "converged; 0 queued" while 21 wrong-language entries
-            # sat untouched — a requeue that silently does nothing is exactly
-            # the failure this loop exists to prevent.
-            if not (english or stale or wrong):
-                break
-            total += do_requeue(english + wrong, stale)
-            english, stale, wrong = gather(allow)
-        else:
+        # Loop until the gate is clean: a requeue that silently leaves
+        # violations behind reports success and the translation run misses them.
+        with profiling.phase("strict.requeue"):
+            total, (english, stale, wrong) = requeue_until_clean(allow, english, stale, wrong)
+        if english or stale or wrong:
             print(
                 f"FAIL: still {len(english)} English / {len(stale)} stale / "
                 f"{len(wrong)} wrong-script after 6 requeue rounds",
@@ -0,0 +1,218 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""Translation memory: answer a repeat translation request without the GPU.
+
+WHY THIS EXISTS
+---------------
+``translate_i18n.py`` dedupes identical English within one locale pass and
+nowhere else.  A string that appears under several keys added on different
+days, a key re-seeded after a rename, a locale file restored from git, an
+``i18n-fix`` run that stopped half-way and is re-run -- each sends English the
+service already translated, to the same model, for the same language, and
+waits on the GPU for the answer it gave last time.
+
+HOW
+---
+``.i18n-cache/translation-memory.sqlite`` maps
+``(sha256(English), language, model)`` to the translation the service
+returned with an "ok" status.  ``translate_i18n.py`` looks each locale's
+sources up before queueing any batch, sends only the misses, and records what
+comes back.  The model tag is part of the key, so a new model on the service
+starts a fresh memory instead of serving the old one's output.
+
+A cached answer is only as good as the gates it would face, and the main
+reason English is re-sent is that ``i18n_strict --requeue`` or
+``i18n_check_markup --requeue`` REJECTED the previous translation.  Serving
+that translation again from the memory would refill the ``[TODO]`` with the
+very value that was rejected, so the requeue/translate loop could never end.
+So every entry is checked against the same tests those gates apply, both when
+it is recorded and when it is served (``acceptable``): no wrong script, not
+a bare placeholder, the English's markup intact, and not simply the English
+back.  An entry that fails is deleted and the string goes to the service.
+A value rejected for a key-specific reason the memory cannot see (an
+allow-list rule) is re-sent on the next run anyway, because the English has
+no entry left to hit.
+
+Entries carry a last-used time.  Every translate run evicts entries unused for
+``MAX_AGE_DAYS`` and, past ``MAX_ENTRIES``, the least recently used ones;
+``python3 scripts/i18n_tm.py --evict`` does the same on demand, with its own
+limits, and ``--stats`` reports the size.  ``I18N_CACHE=0`` or
+``translate_i18n.py --no-tm`` bypass the memory; deleting the file is always
+safe.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+import i18n_strict as strict  # noqa: E402
+from i18n_check_markup import signature  # noqa: E402
+
+TM_PATH = corpus.CACHE_DIR / "translation-memory.sqlite"
+# Two release cycles of non-use; the locales have ~19.5k strings x 13 languages.
+MAX_AGE_DAYS = 180
+MAX_ENTRIES = 500_000
+_DAY = 86400.0
+
+
+def source_digest(text: str) -> str:
+    """Full sha256: the memory returns text for a digest, so no truncation."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def acceptable(lang: str, source: str, text: str) -> bool:
+    """Whether ``text`` would survive the gates as the translation of ``source``."""
+    if text == source:
+        return False
+    if strict.is_placeholder(text) and not strict.is_placeholder(source):
+        return False
+    if strict.wrong_script(lang, text, source):
+        return False
+    return signature(text) == signature(source)
+
+
+class TranslationMemory:
+    """The sqlite memory for one service model; see the module doc."""
+
+    def __init__(self, model: str, path: Path = TM_PATH):
+        self.model = model
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS tm"
+            " (source TEXT NOT NULL, lang TEXT NOT NULL, model TEXT NOT NULL,"
+            "  text TEXT NOT NULL, used REAL NOT NULL,"
+            "  PRIMARY KEY (source, lang, model)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS tm_used ON tm (used);"
+        )
+        self.hits = 0
+        self.rejected = 0
+        self.recorded = 0
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, lang: str, sources: Iterable[str]) -> Dict[str, str]:
+        """``{source: translation}`` for the sources the memory can answer."""
+        now = time.time()
+        found: Dict[str, str] = {}
+        stale = []
+        for src in sources:
+            key = source_digest(src)
+            row = self.db.execute(
+                "SELECT text FROM tm WHERE source = ? AND lang = ? AND model = ?",
+                (key, lang, self.model),
+            ).fetchone()
+            if row is None:
+                continue
+            if acceptable(lang, src, row[0]):
+                found[src] = row[0]
+            else:
+                stale.append((key, lang, self.model))
+        with self.db:
+            self.db.executemany(
+                "UPDATE tm SET used = ? WHERE source = ? AND lang = ? AND model = ?",
+                [(now, source_digest(src), lang, self.model) for src in found],
+            )
+            self.db.executemany(
+                "DELETE FROM tm WHERE source = ? AND lang = ? AND model = ?", stale
+            )
+        self.hits += len(found)
+        self.rejected += len(stale)
+        return found
+
+    def record(self, lang: str, translations: Mapping[str, str]) -> None:
+        """Remember the service's ``{source: translation}`` for ``lang``."""
+        now = time.time()
+        rows = [
+            (source_digest(src), lang, self.model, text, now)
+            for src, text in translations.items()
+            if acceptable(lang, src, text)
+        ]
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO tm (source, lang, model, text, used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        self.recorded += len(rows)
+
+    def evict(
+        self,
+        max_age_days: Optional[float] = MAX_AGE_DAYS,
+        max_entries: Optional[int] = MAX_ENTRIES,
+    ) -> int:
+        """Drop entries unused for ``max_age_days``, then the least recently
+        used beyond ``max_entries`` (either limit None = no limit).  Every
+        model's entries count, not just this one's."""
+        before = self.db.total_changes
+        with self.db:
+            if max_age_days is not None:
+                self.db.execute(
+                    "DELETE FROM tm WHERE used < ?",
+                    (time.time() - max_age_days * _DAY,),
+                )
+            if max_entries is not None:
+                self.db.execute(
+                    "DELETE FROM tm WHERE (source, lang, model) IN"
+                    " (SELECT source, lang, model FROM tm"
+                    "  ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (max_entries,),
+                )
+        return self.db.total_changes - before
+
+    def stats(self) -> Dict[str, int]:
+        """``{model: entries}`` across the whole memory."""
+        return dict(self.db.execute("SELECT model, COUNT(*) FROM tm GROUP BY model"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Inspect or trim the translation memory translate_i18n.py keeps."
+    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--stats", action="store_true", help="entries per model")
+    mode.add_argument("--evict", action="store_true", help="drop old entries now")
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=MAX_AGE_DAYS,
+        help=f"with --evict: drop entries unused this long (default {MAX_AGE_DAYS})",
+    )
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=MAX_ENTRIES,
+        help=f"with --evict: keep at most this many (default {MAX_ENTRIES})",
+    )
+    args = parser.parse_args()
+    if not TM_PATH.exists():
+        print(f"no translation memory at {TM_PATH}")
+        return 0
+    with TranslationMemory("") as tm:
+        if args.evict:
+            print(f"evicted {tm.evict(args.max_age_days, args.max_entries)} entries")
+        for model, count in sorted(tm.stats().items()):
+            print(f"  {model}: {count} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# Copyright (c) 2024-2026 Bryan Everly
+# Licensed under the GNU Affero General Public License v3.0 (AGPL-3.0).
+# See the LICENSE file in the project root for the full terms.
+
+"""End-to-end benchmark of ``translate_i18n.py`` against the mock service.
+
+WHY THIS EXISTS
+---------------
+The translate client's cost was only ever seen as part of a GPU run, where
+the model's time hides it.  Without the GPU box there was no number at all,
+so a change to batching, the pipeline, the checkpoint or the locale writes
+could make ``make translate`` slower and nobody would see it.
+
+HOW
+---
+The scripts, ``i18n-allow.txt`` and the locale JSON are copied into a
+temporary tree, which is a checkout as far as the scripts can tell (their
+cache, checkpoint and source-hash sidecar all land inside it), and the
+same ``--strings`` keys of every locale are reset to ``[TODO] <English>``.
+``i18n_mock_service`` answers in-process on a free port.  These
+``translate_i18n.py --no-tm`` runs are timed:
+
+  0. ``--dry-run``, to warm the sandbox's corpus cache;
+  1. against a zero-latency mock: everything the client does per string
+     (batching, requests, JSON, the checkpoint, the writes) plus fixed costs;
+  2. another ``--dry-run``, untimed: run 1 rewrote the locales, and without
+     it run 3 would pay for re-parsing them, which run 1 did not;
+  3. the same command as 1, ``--repeat`` times, now with nothing left to
+     translate: the fixed costs alone (start-up, loading and scanning the
+     corpus).  Their median is the baseline, their spread the noise;
+  4. after re-seeding, against the mock with the configured latency, slots
+     and failure rates: end-to-end strings/s as a run would see them.
+
+Client overhead per string is (1 - median of 3) / strings, reported as
+measured -- with few strings it is within the noise and can come out
+negative, which is the honest answer there.  ``--output`` writes the
+numbers as JSON for diffing between commits; the real locales and caches
+are never touched.
+
+  make translate-bench
+  python3 scripts/i18n_translate_bench.py --strings 500 --latency 0.2 --per-kchar 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess  # nosec B404 - runs this repo's own script, argument lists only
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_corpus as corpus  # noqa: E402
+import i18n_locale_store as locale_store  # noqa: E402
+import i18n_mock_service as mock  # noqa: E402
+from i18n_no_translate import is_no_translate  # noqa: E402
+from translate_i18n import _HAS_LETTER, TARGET_LANGS  # noqa: E402
+
+REPO = Path(__file__).resolve().parent.parent
+LOCALES_REL = Path("assets") / "locales"
+
+
+def _english(locales: Path) -> Dict[str, str]:
+    return corpus.parse_flat((locales / "en.json").read_text(encoding="utf-8"))
+
+
+@contextmanager
+def _sandboxed():
+    """This process's own locale reads and writes bypass the corpus cache
+    and the write journal: both live in the real checkout, not the sandbox
+    (the timed runs get the sandbox's own)."""
+    saved = {name: os.environ.get(name) for name in ("I18N_CACHE", "I18N_DEFER_WRITES")}
+    os.environ.update(I18N_CACHE="0", I18N_DEFER_WRITES="0")
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def sandbox(root: Path) -> Path:
+    """Copy what ``translate_i18n.py`` reads into ``root``; its locale dir."""
+    shutil.copytree(
+        REPO / "scripts",
+        root / "scripts",
+        ignore=shutil.ignore_patterns("__pycache__", "*.png", "*.pptx"),
+    )
+    shutil.copy2(REPO / "i18n-allow.txt", root / "i18n-allow.txt")
+    locales = root / LOCALES_REL
+    locales.mkdir(parents=True)
+    for path in (REPO / LOCALES_REL).glob("*.json"):
+        shutil.copy2(path, locales / path.name)
+    sidecar = REPO / LOCALES_REL / ".i18n-source-hashes.json"
+    if sidecar.exists():
+        shutil.copy2(sidecar, locales / sidecar.name)
+    return locales
+
+
+def pick(locales: Path, langs: List[str], count: int) -> List[str]:
+    """``count`` keys spread evenly over the English that every one of
+    ``langs`` would send to the service (has letters, not allow-listed)."""
+    english = _english(locales)
+    usable = [
+        key
+        for key, value in english.items()
+        if _HAS_LETTER.search(value)
+        and not any(is_no_translate(key, value, lang) for lang in langs)
+    ]
+    step = max(1, len(usable) // max(1, count))
+    return usable[::step][:count]
+
+
+def seed(locales: Path, langs: List[str], keys: List[str]) -> int:
+    """Reset ``keys`` to ``[TODO] <English>`` in every locale; the number of
+    distinct English strings that puts in front of the service per locale."""
+    english = _english(locales)
+    with _sandboxed():
+        store = locale_store.LocaleStore()
+        for lang in langs:
+            for key in keys:
+                store.requeue(locales / f"{lang}.json", key, english[key])
+        store.commit()
+    return len({english[key] for key in keys})
+
+
+def run(root: Path, langs: List[str], *options: str) -> float:
+    """Wall-clock seconds of one ``translate_i18n.py`` run in the sandbox."""
+    cmd = [
+        sys.executable,
+        str(root / "scripts" / "translate_i18n.py"),
+        "--langs",
+        ",".join(langs),
+        "--no-tm",
+        *options,
+    ]
+    env = {**os.environ, "I18N_DEFER_WRITES": "0"}
+    start = time.perf_counter()
+    proc = subprocess.run(  # nosec B603 - fixed argv from this repo, no shell
+        cmd, cwd=root, env=env, capture_output=True, text=True, check=False
+    )
+    seconds = time.perf_counter() - start
+    if proc.returncode:
+        sys.exit(f"ERROR: translate_i18n.py failed:\n{proc.stdout}{proc.stderr}")
+    return seconds
+
+
+def bench(args: argparse.Namespace) -> Dict[str, object]:
+    langs = [x.strip() for x in args.langs.split(",") if x.strip()]
+    with tempfile.TemporaryDirectory(prefix="i18n-translate-bench-") as tmp:
+        root = Path(tmp)
+        locales = sandbox(root)
+        keys = pick(locales, langs, args.strings)
+        per_locale = seed(locales, langs, keys)
+        strings = per_locale * len(langs)
+
+        # Warm the sandbox's corpus cache first, so runs 1 and 2 both start
+        # with every file they did not just write already snapshotted.
+        run(root, langs, "--dry-run")
+        idle = mock.start()
+        live = ("--service", idle.url, "--inflight", str(args.inflight))
+        try:
+            full = run(root, langs, *live)
+            run(root, langs, "--dry-run")
+            fixed = [run(root, langs, *live) for _ in range(max(1, args.repeat))]
+        finally:
+            idle.shutdown()
+            idle.server_close()
+        if idle.strings != strings:
+            sys.exit(f"ERROR: the mock translated {idle.strings} of {strings} strings")
+
+        seed(locales, langs, keys)
+        (root / ".i18n-cache" / "translate-checkpoint.jsonl").unlink(missing_ok=True)
+        service = mock.start(
+            latency=args.latency,
+            per_kchar=args.per_kchar,
+            slots=args.slots,
+            fail_rate=args.fail_rate,
+            malformed_rate=args.malformed_rate,
+            seed=args.seed,
+        )
+        try:
+            loaded = run(
+                root, langs, "--service", service.url, "--inflight", str(args.inflight)
+            )
+        finally:
+            service.shutdown()
+            service.server_close()
+
+    return {
+        "locales": len(langs),
+        "strings": strings,
+        "inflight": args.inflight,
+        "zero_latency_seconds": round(full, 3),
+        "fixed_seconds": round(statistics.median(fixed), 3),
+        "fixed_runs": len(fixed),
+        "overhead_ms_per_string": round(
+            1000 * (full - statistics.median(fixed)) / strings, 4
+        ),
+        "overhead_noise_ms_per_string": round(
+            1000 * (max(fixed) - min(fixed)) / strings, 4
+        ),
+        "mock": {
+            "latency": args.latency,
+            "per_kchar": args.per_kchar,
+            "slots": args.slots,
+            "fail_rate": args.fail_rate,
+            "malformed_rate": args.malformed_rate,
+        },
+        "seconds": round(loaded, 3),
+        "strings_per_second": round(strings / loaded, 2),
+        "service_batches": service.batches,
+        "service_failed_batches": service.failed,
+        "service_busy_seconds": round(service.busy, 3),
+        "translated": service.strings,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark translate_i18n.py end to end against the mock service."
+    )
+    parser.add_argument(
+        "--strings", type=int, default=250, help="strings to translate per locale"
+    )
+    parser.add_argument("--langs", default=",".join(TARGET_LANGS))
+    parser.add_argument("--inflight", type=int, default=2)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="times to time the fixed-cost run"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="mock seconds per batch"
+    )
+    parser.add_argument(
+        "--per-kchar", type=float, default=0.2, help="mock seconds per 1,000 chars"
+    )
+    parser.add_argument("--slots", type=int, default=1, help="mock batches at once")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    result = bench(args)
+    print(
+        f"translate bench: {result['locales']} locale(s), {result['strings']} "
+        f"string(s), --inflight {result['inflight']}\n"
+        f"  zero-latency service: {result['zero_latency_seconds']:.2f}s "
+        f"(fixed costs {result['fixed_seconds']:.2f}s, median of "
+        f"{result['fixed_runs']}) -> client overhead "
+        f"{result['overhead_ms_per_string']:.3f} "
+        f"+/- {result['overhead_noise_ms_per_string']:.3f} ms/string\n"
+        f"  mock service (latency {args.latency:g}s/batch + {args.per_kchar:g}s/1k "
+        f"chars, {args.slots} slot(s), {args.fail_rate:.0%} failing): "
+        f"{result['seconds']:.2f}s, {result['strings_per_second']:.1f} str/s "
+        f"end to end; {result['service_batches']} batch(es), "
+        f"{result['service_failed_batches']} failed, service busy "
+        f"{result['service_busy_seconds']:.2f}s"
+    )
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,10 +10,12 @@ Modes (one required):
              ``data-i18n="..."`` attribute values, and print a flat list
              to stdout.
   --validate Verify every key referenced in HTML exists in every locale
-             ``.json``.  Exits non-zero on missing keys.  Also reports
-             orphan keys (in-locale-but-not-in-HTML) as a warning, and
-             checks for English-passthrough leaf values (a non-en locale
-             whose value equals the en authoritative value verbatim).
+             ``.json``.  Exits non-zero on missing keys.  Also checks for
+             English-passthrough leaf values (a non-en locale whose value
+             equals the en authoritative value verbatim).
+  --orphans  List the en keys no page's ``data-i18n`` references.  Not an
+             error (JS may look them up), so ``--validate`` stays quiet
+             about them.
   --seed     Like ``--validate``, but missing keys in locale JSONs are
              populated with the English value prefixed by ``[TODO] ``.
              Idempotent — existing values are not overwritten.
@@ -24,14 +26,16 @@ The 14 supported locales are auto-discovered from
 from __future__ import annotations
 
 import argparse
-import json
-import re
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 # pylint: disable=wrong-import-position  # import must follow the sys.path insert
 # above so the sibling helper module resolves when run as a script.
+import i18n_corpus as corpus  # noqa: E402
+import i18n_html_index as html_index  # noqa: E402
+import i18n_locale_store as locale_store  # noqa: E402
+import i18n_profile as profiling  # noqa: E402
 from i18n_no_translate import is_no_translate  # noqa: E402
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
@@ -44,9 +48,6 @@ LOCALES_DIR = REPO_ROOT / "assets" / "locales"
 # per-locale allow-list (i18n-allow.txt) instead of a fuzzy ceiling.  This
 # script now checks key PRESENCE only; run `make i18n-strict` for quality.
 
-DATA_I18N = re.compile(r'data-i18n\s*=\s*"([^"]+)"')
-
-
 # Canonical locale set — anything else under ``assets/locales/`` (e.g.
 # leftover ``missing_keys_analysis.json`` from a translation-pass script)
 # is ignored.  Matches the 14 supported sysmanage locales.
@@ -63,60 +64,15 @@ def list_locales() -> list[str]:
     )
 
 
-def load_locale(lang: str) -> dict:
-    return json.loads((LOCALES_DIR / f"{lang}.json").read_text(encoding="utf-8"))
-
-
-def write_locale(lang: str, data: dict) -> None:
-    (LOCALES_DIR / f"{lang}.json").write_text(
-        json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
-    )
+def load_flat(lang: str) -> dict[str, str]:
+    """Flat read-only view of one locale, from the shared corpus cache."""
+    return corpus.flat(LOCALES_DIR / f"{lang}.json")
 
 
 def extract_html_keys() -> set[str]:
-    """Walk every .html under REPO_ROOT and collect data-i18n keys."""
-    keys: set[str] = set()
-    for path in REPO_ROOT.rglob("*.html"):
-        if any(p.startswith(".") for p in path.parts):  # skip dotfiles
-            continue
-        try:
-            text = path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            continue
-        for match in DATA_I18N.finditer(text):
-            keys.add(match.group(1))
-    return keys
-
-
-def lookup(data: dict, dotted_key: str):
-    parts = dotted_key.split(".")
-    node = data
-    for part in parts:
-        if not isinstance(node, dict) or part not in node:
-            return None
-        node = node[part]
-    return node
-
-
-def insert_dotted(target: dict, dotted_key: str, value) -> None:
-    parts = dotted_key.split(".")
-    for part in parts[:-1]:
-        node = target.get(part)
-        if not isinstance(node, dict):
-            target[part] = {}
-        target = target[part]
-    target[parts[-1]] = value
-
-
-def flatten(d: dict, prefix: str = "") -> dict[str, str]:
-    out: dict[str, str] = {}
-    for key, value in d.items():
-        joined = f"{prefix}.{key}" if prefix else key
-        if isinstance(value, dict):
-            out.update(flatten(value, joined))
-        else:
-            out[joined] = value
-    return out
+    """Every data-i18n key the site's pages use, from the shared HTML index
+    (only pages changed since the last run are re-read)."""
+    return html_index.load(REPO_ROOT).keys()
 
 
 def cmd_extract() -> int:
@@ -125,18 +81,34 @@ def cmd_extract() -> int:
     return 0
 
 
+def cmd_orphans() -> int:
+    """en keys no page references, sorted; informational, always exit 0."""
+    orphans = sorted(load_flat("en").keys() - extract_html_keys())
+    print(
+        f"# {len(orphans)} en key(s) not referenced by any page's data-i18n.\n"
+        f"# Some are looked up from JS; the rest can be dropped from the locales.",
+        file=sys.stderr,
+    )
+    for key in orphans:
+        print(key)
+    return 0
+
+
 def cmd_validate(seed: bool) -> int:
-    keys = extract_html_keys()
+    with profiling.phase("validate.html_keys"):
+        keys = extract_html_keys()
+    profiling.count("validate.html_keys", len(keys))
     locales = list_locales()
     if "en" not in locales:
         print("FAIL: en.json is missing — can't validate without it", file=sys.stderr)
         return 1
-    en_data = load_locale("en")
+    en_flat = load_flat("en")
+    store = locale_store.LocaleStore()
     failures = 0
     for lang in locales:
-        data = load_locale(lang)
-        flat = flatten(data)
-        missing = sorted(keys - set(flat))
+        with profiling.phase("validate.locale", items=1):
+            missing = sorted(keys - load_flat(lang).keys())
+        profiling.count("validate.missing", len(missing))
         if missing:
             print(
                 f"{lang}: {len(missing)} keys referenced in HTML but absent in locale",
@@ -149,7 +121,7 @@ def cmd_validate(seed: bool) -> int:
             if seed:
                 seeded_count = 0
                 for key in missing:
-                    en_value = lookup(en_data, key)
+                    en_value = en_flat.get(key)
                     if isinstance(en_value, str):
                         seeded = en_value if lang == "en" else f"[TODO] {en_value}"
                     else:
@@ -159,12 +131,12 @@ def cmd_validate(seed: bool) -> int:
                         # when the lookup fails today; this just makes that
                         # behavior explicit and visible in the locale file.
                         seeded = f"[MISSING:{key}]"
-                    insert_dotted(data, key, seeded)
-                    seeded_count += 1
-                write_locale(lang, data)
+                    if store.set(LOCALES_DIR / f"{lang}.json", key, seeded):
+                        seeded_count += 1
                 print(f"  → seeded {seeded_count} keys", file=sys.stderr)
             else:
                 failures += 1
+    store.commit()
     if failures:
         print(f"\nFAIL: {failures} issue(s)", file=sys.stderr)
         print(
@@ -207,20 +179,20 @@ def cmd_validate(seed: bool) -> int:
 
 
 def _count_passthrough(
-    en_data: dict, locale_data: dict, keys: set[str], lang: str
+    table, en_col: list, locale_col: list, ids, lang: str
 ) -> int:
     """Count keys whose locale value equals the en value verbatim — a
     proxy for "translator hasn't touched this key yet".  Leaves flagged in
-    i18n-allow.txt (globally or for ``lang``) are excluded."""
+    i18n-allow.txt (globally or for ``lang``) are excluded.
+
+    ``en_col``/``locale_col`` are ``table`` columns and ``ids`` the key IDs to
+    look at (``table.select(keys)``), so this is one aligned scan."""
     count = 0
-    for key in keys:
-        en_val = lookup(en_data, key)
-        loc_val = lookup(locale_data, key)
-        if not isinstance(en_val, str) or not isinstance(loc_val, str):
-            continue
+    for i in ids:
+        en_val = en_col[i]
         if (
-            loc_val == en_val
-            and not is_no_translate(key, en_val, lang)  # skip flagged leaves
+            locale_col[i] == en_val
+            and not is_no_translate(table.keys[i], en_val, lang)  # skip flagged leaves
         ):
             count += 1
     return count
@@ -230,20 +202,18 @@ def cmd_report_passthrough(only_lang: "str | None" = None) -> int:
     """List the still-counted passthrough leaves (English values not yet flagged
     in i18n-allow.txt), most-frequent first, so they can be curated.  Pass
     ``--lang xx`` to scope to one locale (useful for per-language cognates)."""
-    keys = extract_html_keys()
-    en_data = load_locale("en")
+    table = corpus.key_table(LOCALES_DIR / "en.json")
+    # Only HTML keys that English has: a key English lacks has no passthrough.
+    ids = table.select(extract_html_keys())
+    en_col = table.column(load_flat("en"))
     counter: dict[str, int] = {}
     langs = [only_lang] if only_lang else [x for x in list_locales() if x != "en"]
     for lang in langs:
-        loc = load_locale(lang)
-        for key in keys:
-            en_val = lookup(en_data, key)
-            loc_val = lookup(loc, key)
-            if (
-                isinstance(en_val, str)
-                and isinstance(loc_val, str)
-                and loc_val == en_val
-                and not is_no_translate(key, en_val, lang)
+        loc_col = table.column(load_flat(lang))
+        for i in ids:
+            en_val = en_col[i]
+            if loc_col[i] == en_val and not is_no_translate(
+                table.keys[i], en_val, lang
             ):
                 counter[en_val] = counter.get(en_val, 0) + 1
     scope = f" for {only_lang}" if only_lang else ""
@@ -262,13 +232,19 @@ def main() -> int:
     mode.add_argument("--validate", action="store_true")
     mode.add_argument("--seed", action="store_true")
     mode.add_argument("--report-passthrough", action="store_true")
+    mode.add_argument("--orphans", action="store_true",
+                      help="list en keys no page references (informational)")
     parser.add_argument("--lang", default=None,
                         help="scope --report-passthrough to one locale")
+    profiling.add_argument(parser)
     args = parser.parse_args()
+    profiling.start("i18n_validate", args.profile)
     if args.extract:
         return cmd_extract()
     if args.report_passthrough:
         return cmd_report_passthrough(args.lang)
+    if args.orphans:
+        return cmd_orphans()
     return cmd_validate(seed=args.seed)
 
 
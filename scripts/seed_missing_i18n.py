@@ -27,12 +27,17 @@ translations and existing ``[TODO]`` gaps are left alone.  After running,
 """
 from __future__ import annotations
 
-import json
 import re
+import sys
 from pathlib import Path
 
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pylint: disable=wrong-import-position  # import must follow the sys.path insert
+import i18n_html_index as html_index  # noqa: E402
+import i18n_locale_store as locale_store  # noqa: E402
+
 REPO = Path(__file__).resolve().parent.parent
 LOCALES_DIR = REPO / "assets" / "locales"
 LOCALES = [
@@ -46,62 +51,15 @@ def collapse(text: str) -> str:
     return _WS.sub(" ", text).strip()
 
 
-def walk(obj, prefix=""):
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            yield from walk(value, f"{prefix}.{key}" if prefix else key)
-    else:
-        yield prefix, obj
-
-
-def get_dotted(data: dict, dotted: str):
-    cur = data
-    for part in dotted.split("."):
-        if isinstance(cur, dict) and part in cur:
-            cur = cur[part]
-        else:
-            return None
-    return cur
-
-
-def set_dotted(data: dict, dotted: str, value) -> bool:
-    parts = dotted.split(".")
-    cur = data
-    for part in parts[:-1]:
-        nxt = cur.get(part)
-        if not isinstance(nxt, dict):
-            if nxt is not None:
-                return False
-            nxt = {}
-            cur[part] = nxt
-        cur = nxt
-    cur[parts[-1]] = value
-    return True
-
-
-def load(lang: str) -> dict:
-    return json.loads((LOCALES_DIR / f"{lang}.json").read_text(encoding="utf-8"))
-
-
-def dump(lang: str, data: dict) -> None:
-    (LOCALES_DIR / f"{lang}.json").write_text(
-        json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-    )
-
-
 def main() -> int:
-    en = load("en")
-    missing = {
-        k for k, v in walk(en)
-        if isinstance(v, str) and v.startswith("[MISSING:")
-    }
+    store = locale_store.LocaleStore()
+    en = store.view(LOCALES_DIR / "en.json")
+    missing = {k for k, v in en.items() if v.startswith("[MISSING:")}
     print(f"{len(missing)} [MISSING] keys in en.json")
 
-    html_files = [
-        p for p in REPO.rglob("*.html")
-        if "node_modules" not in p.parts
-        and not any(part.startswith(".") for part in p.parts)
-    ]
+    # Only the pages that reference a [MISSING] key need BeautifulSoup; the
+    # shared index says which those are without parsing any of them.
+    html_files = [REPO / rel for rel in html_index.load(REPO).pages_with(missing)]
 
     extracted: dict[str, tuple[str, bool]] = {}  # key -> (value, is_html)
     skipped_nested = []
@@ -143,15 +101,16 @@ def main() -> int:
         print(f"WARN: {len(orphan)} [MISSING] keys have no HTML element (left as-is)")
 
     for lang in LOCALES:
-        data = load(lang)
+        path = LOCALES_DIR / f"{lang}.json"
+        have = store.view(path)
         n = 0
         for key, (val, _ishtml) in extracted.items():
-            cur = get_dotted(data, key)
-            if cur is None or (isinstance(cur, str) and cur.startswith("[MISSING:")):
-                if set_dotted(data, key, val if lang == "en" else f"[TODO] {val}"):
+            cur = have.get(key)
+            if cur is None or cur.startswith("[MISSING:"):
+                if store.set(path, key, val if lang == "en" else f"[TODO] {val}"):
                     n += 1
-        dump(lang, data)
         print(f"  {lang}: seeded {n}")
+    store.commit()
     return 0
 
 
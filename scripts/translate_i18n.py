@@ -17,7 +17,11 @@ Usage:
   python3 scripts/translate_i18n.py            # or:  make translate
   python3 scripts/translate_i18n.py --dry-run  # report gap counts, no writes
 
-Flags: --service URL, --langs de,ja, --limit N, --client-batch N, --dry-run.
+Flags: --service URL, --langs de,ja, --limit N, --dry-run, --inflight N
+(batches at the service at once), --batch-chars N / --batch-seconds S /
+--client-batch N (adaptive batch sizing, see i18n_service.py), --no-tm (skip
+the translation memory, see i18n_tm.py), --resume (replay an interrupted run's
+checkpoint), --jobs N (gap scans in N processes).
 The .po driver needs polib (pip install polib); JSON needs only the stdlib.
 """
 
@@ -28,16 +32,19 @@ import json
 import os
 import re
 import sys
-import urllib.error
-import urllib.request
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 # pylint: disable=wrong-import-position  # import must follow the sys.path insert
 # above so the sibling helper module resolves when run as a script.
-from i18n_hashes import record_translated  # noqa: E402
-from i18n_no_translate import is_no_translate  # noqa: E402
+import i18n_corpus as corpus  # noqa: E402
+import i18n_locale_store as locale_store  # noqa: E402
+import i18n_profile as profiling  # noqa: E402
+import i18n_service as client  # noqa: E402
+from i18n_hashes import digest, record_translated  # noqa: E402
+from i18n_no_translate import no_translate_ids  # noqa: E402
+from i18n_tm import TranslationMemory  # noqa: E402
 
 # ===== per-project configuration (the ONLY part that differs per repo) =====
 PROJECT = "sysmanage-docs"
@@ -68,104 +75,81 @@ TARGET_LANGS = [
 # English because it couldn't translate safely".
 _HAS_LETTER = re.compile(r"[^\W\d_]", re.UNICODE)
 
-# Placeholder/markup tokens — used to distinguish a placeholder-fallback
-# (identical output because the service couldn't translate a {{…}}/%s/<tag>
-# safely) from a legitimately-identical term (acronyms like URL/IPv4 or words
-# the model keeps as-is, e.g. "Details"). Only the former is held back to retry.
-_PLACEHOLDER_RE = re.compile(
-    r"\{\{.*?\}\}|\$\{[^}]+\}|\{[^{}]*\}|%\d+\$[sdfgex]|%\(\w+\)[sdfgexr]"
-    r"|%[sdfgexr%]|\$[A-Za-z_]\w*|</?[A-Za-z][^>]*>|&[a-zA-Z]+;|&#\d+;"
-)
+CHECKPOINT_PATH = corpus.CACHE_DIR / "translate-checkpoint.jsonl"
 
 
 # ---------------------------------------------------------------------------
-# Service client
+# Checkpoint  (write-ahead log of the service's answers, for --resume)
 # ---------------------------------------------------------------------------
 
 
-def _post(url: str, payload: dict, timeout: float = 1800.0) -> dict:
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url, data=data, headers={"Content-Type": "application/json"}, method="POST"
-    )
-    # nosemgrep: dynamic-urllib-use-detected -- service URL is operator config (trusted LAN), not request input
-    # B310 rationale: the service URL is operator-supplied config (trusted LAN
-    # GPU box), always http(s); no file:/custom scheme, no request-derived input.
-    with urllib.request.urlopen(
-        req, timeout=timeout
-    ) as resp:  # noqa: S310 (trusted LAN)  # nosec B310
-        return json.loads(resp.read().decode("utf-8"))
+class Checkpoint:
+    """Every translation the service returns, appended as its batch lands.
 
+    A locale file is only written once ALL of its batches are in, so a run
+    killed part-way through a locale used to throw away every batch the GPU
+    had already finished for it.  Each ``(lang, key, sha256(English)[:16],
+    translation)`` now goes to ``.i18n-cache/translate-checkpoint.jsonl``
+    first; ``--resume`` replays that log before anything is sent, for the
+    keys that are still untranslated and whose English has not changed
+    since.  A run that finishes removes the log.  Without ``--resume`` a
+    leftover log is discarded and the run starts clean.
+    """
 
-def _service_ok(service: str) -> bool:
-    try:
-        # nosemgrep: dynamic-urllib-use-detected -- service URL is operator config (trusted LAN), not request input
-        # B310 rationale: same trusted operator-config service URL as above.
-        with urllib.request.urlopen(  # noqa: S310  # nosec B310
-            f"{service.rstrip('/')}/health", timeout=10
-        ) as resp:
-            return resp.status == 200
-    except (urllib.error.URLError, OSError):
-        return False
-
-
-def translate_to(
-    service: str, texts: List[str], lang: str, client_batch: int
-) -> List[str]:
-    out: List[str] = []
-    for i in range(0, len(texts), client_batch):
-        chunk = texts[i : i + client_batch]
-        try:
-            resp = _post(
-                f"{service.rstrip('/')}/translate/batch",
-                {"texts": chunk, "targets": [lang], "require_change": True},
-                # We already filtered our intentionally-English strings
-                # through i18n-allow.txt, so anything still here MUST
-                # change; identical output is a failure, not a result.
-            )
-        except (urllib.error.URLError, OSError) as exc:
-            sys.exit(
-                f"\nERROR: lost connection to the translation service at {service}: {exc}\n"
-                "  Already-finished languages are saved; re-run to resume."
+    def __init__(self, resume: bool, path: Path = CHECKPOINT_PATH):
+        self.path = path
+        # lang -> key -> (English digest, translation)
+        self.replay: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        if resume and path.exists():
+            with path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                        entry = (rec["hash"], rec["text"])
+                        self.replay.setdefault(rec["lang"], {})[rec["key"]] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue  # the torn last line of a killed run
+            count = sum(map(len, self.replay.values()))
+            print(f"  resuming: {count} translation(s) in the checkpoint", flush=True)
+        elif resume:
+            print("  resuming: no checkpoint, starting clean", flush=True)
+        elif path.exists():
+            print(f"  discarding the checkpoint of an earlier run ({path})", flush=True)
+            path.unlink()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending even when resuming: the replayed answers stay in the log
+        # until a run completes, however many times it is interrupted.
+        self._fh = path.open("a", encoding="utf-8")
+
+    def resumed(self, lang: str, todo: List[Tuple[str, str]]) -> Dict[str, str]:
+        """``{source: translation}`` the log holds for ``todo``'s keys."""
+        entries = self.replay.get(lang, {})
+        out: Dict[str, str] = {}
+        for key, en_src in todo:
+            hit = entries.get(key)
+            if hit is not None and hit[0] == digest(en_src):
+                out[en_src] = hit[1]
+        return out
+
+    def record(self, lang: str, keys: Dict[str, List[str]], batch: Dict[str, str]) -> None:
+        """Log one batch's ``{source: translation}`` under every key using it."""
+        self._fh.write(
+            "".join(
+                json.dumps(
+                    {"lang": lang, "key": key, "hash": digest(src), "text": text},
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for src, text in batch.items()
+                for key in keys.get(src, ())
             )
-        for item in resp["results"]:
-            # Take the service's OWN verdict rather than inferring one by
-            # comparing output to input.  Comparing cannot distinguish "the
-            # model legitimately kept this as-is" (IPv4, FQDN) from "the
-            # service gave up and returned the English", which is why such
-            # strings used to be re-sent over the network forever.
-            # An older service omits "status"; assume ok so this still works.
-            status = (item.get("status") or {}).get(lang, "ok")
-            out.append((item["translations"][lang], status == "ok"))
-        print(f"      …{min(i + client_batch, len(texts))}/{len(texts)}", flush=True)
-    return out
-
-
-
-
-def _resolve_translations(
-    service: str, sources: List[str], lang: str, client_batch: int
-) -> Dict[str, str]:
-    """``{source: translation}`` for what the service actually translated.
-
-    NO retry passes.  The service retries a bad reply itself, next to the
-    model, and reports the outcome per string via ``status`` — so re-sending
-    from here was a LAN round-trip to ask the same model the same question,
-    driven by a guess ("identical output means it failed") that is wrong for
-    every term whose correct translation IS the English.
-
-    Sources the service reports as a fallback are OMITTED rather than
-    force-accepted on a final pass.  Force-accepting wrote the English while
-    clearing the ``[TODO]``, which hid the failure from the gap gate entirely;
-    leaving the gap keeps it visible and retryable.
-    """
-    resolved: Dict[str, str] = {}
-    for src, (text, ok) in zip(
-        sources, translate_to(service, sources, lang, client_batch)
-    ):
-        if ok:
-            resolved[src] = text
-    return resolved
+        )
+        self._fh.flush()
+
+    def close(self, finished: bool) -> None:
+        self._fh.close()
+        if finished:
+            self.path.unlink(missing_ok=True)
 
 
 # ---------------------------------------------------------------------------
@@ -173,45 +157,101 @@ def _resolve_translations(
 # ---------------------------------------------------------------------------
 
 
-def _flatten(obj: dict, prefix: str = "") -> Dict[str, str]:
-    flat: Dict[str, str] = {}
-    for key, val in obj.items():
-        dotted = f"{prefix}.{key}" if prefix else key
-        if isinstance(val, dict):
-            flat.update(_flatten(val, dotted))
-        elif isinstance(val, str):
-            flat[dotted] = val
-    return flat
-
-
-def _set_dotted(obj: dict, dotted: str, value: str) -> None:
-    cur = obj
-    parts = dotted.split(".")
-    for p in parts[:-1]:
-        cur = cur.setdefault(p, {})
-    cur[parts[-1]] = value
-
-
 def _is_json_gap(value: Optional[str]) -> bool:
     return value is None or (isinstance(value, str) and value.startswith("[TODO]"))
 
 
-def _is_passthrough(en_src: str, value: Optional[str]) -> bool:
-    """A non-en leaf left identical to the English source is an untranslated
-    passthrough.  Treat it as a gap so the service gets a chance at it —
-    autotagged ``docs.auto.*`` keys land as raw English with no ``[TODO]``
-    prefix, so they are otherwise invisible to this pass.
-
-    NO minimum length: a short label is as user-facing as a paragraph, and a
-    length floor is an invisible exemption nobody reviews.  Genuinely-invariant
-    terms belong in i18n-allow.txt (filtered out before sending); anything else
-    that comes back unchanged is reported by the service as a fallback and left
-    alone rather than churning."""
-    return (
-        isinstance(value, str)
-        and value == en_src
-        and bool(_HAS_LETTER.search(en_src))
-    )
+class EnglishIndex:
+    """What every locale's gap test needs from English, worked out once.
+
+    The gap scan and the pass used to re-derive this for each key of each
+    locale -- the English value, a regex for "has a letter", an allow-list
+    lookup per English-identical value -- although none of it depends on the
+    locale except the few ``<lang>:`` scoped rules.  Here the English column
+    and its letter-bearing IDs are computed once per run, and an
+    intentionally-English verdict once per key: the global rules are asked
+    about a key the first time any locale needs to know, each locale's
+    scoped rules the first time that locale does.  The per-locale test is
+    then a loop of comparisons and set lookups.  IDs are
+    ``corpus.key_table`` IDs; ``order`` lists them in English order.
+    """
+
+    def __init__(self, en_path: Path):
+        self.flat = corpus.flat(en_path)
+        self.table = corpus.key_table(en_path)
+        self.keys = self.table.keys
+        self.column = self.table.column(self.flat)
+        self.order = self.table.order(self.flat)
+        self.letters = {i for i in self.order if _HAS_LETTER.search(self.column[i])}
+        # (IDs asked about, IDs allowed) for the global rules, and per locale
+        # for its scoped ones.
+        self._global: Tuple[set, set] = (set(), set())
+        self._scoped: Dict[str, Tuple[set, set]] = {}
+
+    def exempt(self, ids: List[int], lang: str) -> set:
+        """Those of ``ids`` flagged intentionally-English for ``lang``
+        (``is_no_translate``)."""
+        asked, allowed = self._global
+        fresh = [i for i in ids if i not in asked]
+        if fresh:
+            asked.update(fresh)
+            allowed |= no_translate_ids(self.keys, self.column, fresh)
+        asked_in, allowed_in = self._scoped.setdefault(lang, (set(), set()))
+        fresh = [i for i in ids if i not in asked_in and i not in allowed]
+        if fresh:
+            asked_in.update(fresh)
+            allowed_in |= no_translate_ids(
+                self.keys, self.column, fresh, lang, scoped=True
+            )
+        return {i for i in ids if i in allowed or i in allowed_in}
+
+    def gaps(self, loc_col: list, lang: str) -> List[int]:
+        """IDs, in English order, that are a gap (``_is_json_gap``) or an
+        untranslated passthrough in the locale whose column is ``loc_col``.
+
+        A passthrough is a leaf left identical to an English source that has
+        a letter and is not intentionally English.  Treat it as a gap so the
+        service gets a chance at it — autotagged ``docs.auto.*`` keys land as
+        raw English with no ``[TODO]`` prefix, so they are otherwise invisible
+        to this pass.
+
+        NO minimum length: a short label is as user-facing as a paragraph, and
+        a length floor is an invisible exemption nobody reviews.
+        Genuinely-invariant terms belong in i18n-allow.txt (filtered out before
+        sending); anything else that comes back unchanged is reported by the
+        service as a fallback and left alone rather than churning."""
+        en_col, letters = self.column, self.letters
+        found, same = [], []
+        for i in self.order:
+            value = loc_col[i]
+            if value is None or value.startswith("[TODO]"):
+                found.append(i)
+            elif value == en_col[i] and i in letters:
+                found.append(i)
+                same.append(i)
+        if not same:
+            return found
+        exempt = self.exempt(same, lang)
+        return [i for i in found if i not in exempt] if exempt else found
+
+
+# en_path -> (the English ``corpus.flat`` it was built from, its EnglishIndex).
+_INDEXES: Dict[Path, tuple] = {}
+
+
+def english_index(en_path: Path) -> EnglishIndex:
+    """The ``EnglishIndex`` of ``en_path``, built once per process.
+
+    ``corpus.flat`` hands back the same dict until the file changes, so that
+    identity is the staleness check.  The allow-list is read once per process
+    anyway (``i18n_no_translate``)."""
+    en_path = Path(en_path)
+    hit = _INDEXES.get(en_path)
+    if hit and hit[0] is corpus.flat(en_path):
+        return hit[1]
+    index = EnglishIndex(en_path)
+    _INDEXES[en_path] = (index.flat, index)
+    return index
 
 
 def run_json(
@@ -219,13 +259,17 @@ def run_json(
     template: str,
     langs: List[str],
     service: Optional[str],
-    client_batch: int,
+    sizer: client.BatchSizer,
     limit: Optional[int],
+    inflight: int = 1,
+    tm: Optional[TranslationMemory] = None,
+    checkpoint: Optional[Checkpoint] = None,
 ) -> None:
     en_path = base / template.format(lang="en")
     if not en_path.exists():
         sys.exit(f"ERROR: source file not found: {en_path}")
-    en_flat = _flatten(json.loads(en_path.read_text(encoding="utf-8")))
+    index = english_index(en_path)
+    en_flat, keys, en_col = index.flat, index.keys, index.column
 
     # Staleness-sidecar bookkeeping.  Collected across ALL locales because the
     # sidecar is per KEY, not per key-per-language: recording a key after
@@ -233,14 +277,25 @@ def run_json(
     # stale check.  See i18n_hashes for the full rule.
     translated_keys: set = set()
     locale_flats: Dict[str, Dict[str, str]] = {}
+    # Planned up front, translated together:
+    # {lang: (path, store, todo, answers from the checkpoint and the memory)}.
+    pending: Dict[str, tuple] = {}
+    keys_of: Dict[str, Dict[str, List[str]]] = {}  # {lang: {source: [key, ...]}}
+    work: List[Tuple[str, List[str]]] = []
 
     for lang in langs:
         path = base / template.format(lang=lang)
         if not path.exists():
             print(f"  {lang}: file missing ({path}) — skipped", flush=True)
             continue
-        doc = json.loads(path.read_text(encoding="utf-8"))
-        lang_flat = _flatten(doc)
+        # Edits are queued on the locale's store and written once, when its
+        # translations are in.
+        store = locale_store.LocaleStore()
+        lang_flat = store.view(path)
+        loc_col = index.table.column(lang_flat)
+        found = index.gaps(loc_col, lang)
+        exempt = index.exempt(found, lang)
+        profiling.count("translate.gaps", len(found))
         # Self-heal the intentionally-English [TODO] trap.  A leaf flagged
         # intentionally-English (``is_no_translate`` — a proper noun, a brand/
         # tier label, an arrow-suffixed CTA, a per-language cognate, etc.) is
@@ -252,18 +307,11 @@ def run_json(
         # read-only ``--dry-run``/check).
         if service is not None:
             healed = 0
-            for key, en_src in en_flat.items():
-                if is_no_translate(key, en_src, lang) and _is_json_gap(
-                    lang_flat.get(key)
-                ):
-                    _set_dotted(doc, key, en_src)
+            for i in found:
+                if i in exempt:  # only a [TODO] gap: ``gaps`` drops exempt passthroughs
+                    store.set(path, keys[i], en_col[i])
                     healed += 1
             if healed:
-                lang_flat = _flatten(doc)
-                path.write_text(
-                    json.dumps(doc, ensure_ascii=False, indent=2) + "\n",
-                    encoding="utf-8",
-                )
                 print(
                     f"  {lang}: resolved {healed} intentionally-English leaf/leaves",
                     flush=True,
@@ -278,13 +326,9 @@ def run_json(
         # "English-identical" source is a leaf still equal to English (proper
         # nouns, technical terms) that we re-send best-effort but is NOT a gap.
         todo: List[Tuple[str, str]] = [
-            (key, en_src)
-            for key, en_src in en_flat.items()
-            if (
-                _is_json_gap(lang_flat.get(key))
-                or _is_passthrough(en_src, lang_flat.get(key))
-            )
-            and not is_no_translate(key, en_src, lang)  # flagged intentionally-English
+            (keys[i], en_col[i])
+            for i in found
+            if i not in exempt  # flagged intentionally-English, healed above
         ]
         if limit:
             todo = todo[:limit]
@@ -299,9 +343,35 @@ def run_json(
             f"  {lang}: {n_gap} gap(s){extra} — {len(uniq)} string(s) to translate",
             flush=True,
         )
+        profiling.count("translate.strings_planned", len(uniq))
         if not todo or service is None:
+            store.commit()
             continue
-        translations = _resolve_translations(service, uniq, lang, client_batch)
+        # Only what an interrupted run already got back, or the translation
+        # memory can answer, is not sent to the service.
+        resumed = checkpoint.resumed(lang, todo) if checkpoint else {}
+        if resumed:
+            print(f"  {lang}: {len(resumed)} from the checkpoint", flush=True)
+        cached = tm.lookup(lang, [s for s in uniq if s not in resumed]) if tm else {}
+        if cached:
+            print(f"  {lang}: {len(cached)} from translation memory", flush=True)
+        pending[lang] = (path, store, todo, resumed, cached)
+        for key, en_src in todo:
+            keys_of.setdefault(lang, {}).setdefault(en_src, []).append(key)
+        work.append(
+            (lang, [src for src in uniq if src not in resumed and src not in cached])
+        )
+
+    def on_batch(lang: str, batch: Dict[str, str]) -> None:
+        if checkpoint:
+            checkpoint.record(lang, keys_of[lang], batch)
+
+    for lang, translations in client.pipeline(service, work, sizer, inflight, on_batch):
+        path, store, todo, resumed, cached = pending[lang]
+        translations.update(resumed)
+        if tm:
+            tm.record(lang, translations)
+        translations.update(cached)
         written = set()
         for key, en_src in todo:
             cand = translations.get(en_src)
@@ -313,29 +383,17 @@ def run_json(
             # instead: a gap stays a gap, and stays visible.
             if cand is None:
                 continue
-            _set_dotted(doc, key, cand)
+            store.set(path, key, cand)
             written.add(en_src)
             translated_keys.add(key)
-        path.write_text(
-            json.dumps(doc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-        )
+        after = store.view(path)
+        store.commit()
         # Count what the pass ACTUALLY leaves untranslated — gaps AND values
         # still equal to their English source.  Counting only [TODO] here is
         # how the run could report "0 gap(s) remaining" while dozens of strings
         # in that same locale were still English.
-        after = _flatten(doc)
         locale_flats[lang] = after
-        remaining = sum(
-            1
-            for k, en_src in en_flat.items()
-            if (
-                _is_json_gap(after.get(k))
-                or (
-                    _is_passthrough(en_src, after.get(k))
-                    and not is_no_translate(k, en_src, lang)
-                )
-            )
-        )
+        remaining = len(index.gaps(index.table.column(after), lang))
         print(
             f"  {lang}: wrote {len(written)} new, {remaining} still untranslated",
             flush=True,
@@ -349,6 +407,20 @@ def run_json(
     recorded = record_translated(base, en_flat, locale_flats, translated_keys)
     if recorded:
         print(f"  recorded {recorded} source hash(es) for staleness", flush=True)
+    _tm_summary(tm)
+
+
+def _tm_summary(tm: Optional[TranslationMemory]) -> None:
+    """Report what the translation memory answered, and trim it."""
+    if tm is None:
+        return
+    evicted = tm.evict()
+    print(
+        f"  translation memory: {tm.hits} answered locally, {tm.rejected} "
+        f"rejected (re-sent), {tm.recorded} recorded"
+        + (f", {evicted} evicted" if evicted else ""),
+        flush=True,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -361,8 +433,9 @@ def run_po(
     template: str,
     langs: List[str],
     service: Optional[str],
-    client_batch: int,
+    sizer: client.BatchSizer,
     limit: Optional[int],
+    tm: Optional[TranslationMemory] = None,
 ) -> None:
     try:
         import polib  # noqa: PLC0415
@@ -381,7 +454,14 @@ def run_po(
         if not gap_entries or service is None:
             continue
         uniq = sorted({e.msgid for e in gap_entries})
-        translations = _resolve_translations(service, uniq, lang, client_batch)
+        cached = tm.lookup(lang, uniq) if tm else {}
+        misses = [src for src in uniq if src not in cached]
+        translations = (
+            client.resolve_translations(service, misses, lang, sizer) if misses else {}
+        )
+        if tm:
+            tm.record(lang, translations)
+        translations.update(cached)
         wrote = 0
         for e in gap_entries:
             cand = translations.get(e.msgid, e.msgid)
@@ -392,6 +472,7 @@ def run_po(
                 wrote += 1
         po.save(str(path))
         print(f"  {lang}: wrote {wrote} new (all gaps resolved)", flush=True)
+    _tm_summary(tm)
 
 
 # ---------------------------------------------------------------------------
@@ -399,36 +480,41 @@ def run_po(
 # ---------------------------------------------------------------------------
 
 
+def scan_locale_gaps(en_path: Path, path: Path, lang: str) -> List[str]:
+    """Untranslated keys of one JSON locale, in English order.
+
+    Module-level so ``--jobs`` can hand one locale to each worker process."""
+    index = english_index(en_path)
+    keys = index.keys
+    # Same definition the pass uses — see the note in the app clients.
+    return [keys[i] for i in index.gaps(index.table.column(corpus.flat(path)), lang)]
+
+
 def scan_gaps(
-    base: Path, template: str, langs: List[str], fmt: str
+    base: Path, template: str, langs: List[str], fmt: str, jobs: int = 1
 ) -> Dict[str, List[str]]:
     """Re-read the locale files on disk and return {lang: [untranslated keys]}.
 
     Authoritative — reads what was actually written, so it reflects strings the
-    service held back (placeholder fallbacks) as well as any never filled."""
+    service held back (placeholder fallbacks) as well as any never filled.
+    ``jobs`` > 1 scans the JSON locales in that many worker processes."""
     result: Dict[str, List[str]] = {}
     if fmt == "json":
-        en_flat = _flatten(
-            json.loads((base / template.format(lang="en")).read_text(encoding="utf-8"))
-        )
+        en_path = base / template.format(lang="en")
+        shards = []
         for lang in langs:
             path = base / template.format(lang=lang)
-            if not path.exists():
-                result[lang] = ["<file missing>"]
-                continue
-            lf = _flatten(json.loads(path.read_text(encoding="utf-8")))
-            # Same definition the pass uses — see the note in the app clients.
-            result[lang] = [
-                k
-                for k, en_src in en_flat.items()
-                if (
-                    _is_json_gap(lf.get(k))
-                    or (
-                        _is_passthrough(en_src, lf.get(k))
-                        and not is_no_translate(k, en_src, lang)
-                    )
-                )
-            ]
+            if path.exists():
+                shards.append((en_path, path, lang))
+        found = dict(
+            zip(
+                [lang for _en, _path, lang in shards],
+                corpus.map_sharded(scan_locale_gaps, shards, jobs),
+            )
+        )
+        # Keyed in ``langs`` order, as the serial scan always was.
+        for lang in langs:
+            result[lang] = found.get(lang, ["<file missing>"])
     else:
         import polib  # noqa: PLC0415
 
@@ -444,12 +530,16 @@ def scan_gaps(
     return result
 
 
-def enforce_no_gaps(base: Path, template: str, langs: List[str], fmt: str) -> None:
+def enforce_no_gaps(
+    base: Path, template: str, langs: List[str], fmt: str, jobs: int = 1
+) -> None:
     """Exit NON-ZERO, loudly, if any locale still has untranslated strings.
 
     Wired into ``make translate`` so an incomplete locale set fails the build
     instead of quietly sliding through — translations must be 100%."""
-    offenders = {l: ks for l, ks in scan_gaps(base, template, langs, fmt).items() if ks}
+    offenders = {
+        l: ks for l, ks in scan_gaps(base, template, langs, fmt, jobs).items() if ks
+    }
     if not offenders:
         print(
             f"[OK] {PROJECT}: 0 untranslated gaps in {len(langs)} locale(s).\n"
@@ -497,9 +587,47 @@ def main() -> None:
         default=os.getenv("TRANSLATION_SERVICE_URL", "http://localhost:8765"),
     )
     ap.add_argument("--langs", default=None, help="comma-separated locale subset")
-    ap.add_argument("--client-batch", type=int, default=100)
+    ap.add_argument(
+        "--client-batch",
+        type=int,
+        default=client.BATCH_STRINGS,
+        help="most strings in one batch request "
+        f"(default {client.BATCH_STRINGS})",
+    )
+    ap.add_argument(
+        "--batch-chars",
+        type=int,
+        default=client.BATCH_CHARS,
+        help="characters of English in the first batch; later batches are "
+        f"sized from the service's observed speed (default {client.BATCH_CHARS})",
+    )
+    ap.add_argument(
+        "--batch-seconds",
+        type=float,
+        default=client.BATCH_SECONDS,
+        help="latency to size batches for "
+        f"(default {client.BATCH_SECONDS:g}s)",
+    )
+    ap.add_argument(
+        "--inflight",
+        type=int,
+        default=2,
+        help="batch requests kept at the service at once, across locales "
+        "(default 2: one being translated, the next already queued)",
+    )
     ap.add_argument("--limit", type=int, default=None)
     ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument(
+        "--no-tm",
+        action="store_true",
+        help="send every string to the service, bypassing the translation memory",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="first apply what an interrupted run's checkpoint already holds "
+        "(otherwise a leftover checkpoint is discarded)",
+    )
     ap.add_argument(
         "--fail-on-gaps",
         action="store_true",
@@ -511,7 +639,19 @@ def main() -> None:
         help="offline completeness gate: scan locales and exit non-zero if any gap "
         "remains. NO service calls, NO writes — safe for CI / release hooks.",
     )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="gap-scan locales in N worker processes (0 = one per CPU)",
+    )
+    profiling.add_argument(ap)
     args = ap.parse_args()
+    profiling.start("translate_i18n", args.profile)
+    profiling.instrument(
+        sys.modules[__name__], "english_index", "scan_locale_gaps", prefix="translate."
+    )
+    profiling.instrument(EnglishIndex, "gaps", "exempt", prefix="translate.EnglishIndex.")
 
     base = Path(__file__).resolve().parents[1] / LOCALES_REL
     if not base.exists():
@@ -530,12 +670,13 @@ def main() -> None:
     # disk and exits non-zero (loudly) if anything is still untranslated.
     if args.check:
         print("mode=check (offline — no service calls, no writes)", flush=True)
-        enforce_no_gaps(base, FILE_TEMPLATE, langs, FORMAT)
+        with profiling.phase("translate.gap_scan"):
+            enforce_no_gaps(base, FILE_TEMPLATE, langs, FORMAT, args.jobs)
         return
 
     print(f"service={service or '(dry-run)'} langs={langs}", flush=True)
 
-    if service and not _service_ok(service):
+    if service and not client.service_ok(service):
         sys.exit(
             f"\nERROR: translation service not reachable at {service}\n"
             "  Is it running on the GPU box?  Point at it with one of:\n"
@@ -544,16 +685,50 @@ def main() -> None:
             "  (the default is http://localhost:8765)."
         )
 
-    if FORMAT == "json":
-        run_json(base, FILE_TEMPLATE, langs, service, args.client_batch, args.limit)
-    else:
-        run_po(base, FILE_TEMPLATE, langs, service, args.client_batch, args.limit)
+    # Repeat requests are answered locally (see i18n_tm).  Only for a real
+    # run: a dry run sends nothing, so there is nothing to save it.
+    tm = None
+    if service and corpus.cache_enabled() and not args.no_tm:
+        tm = TranslationMemory(client.service_tag(service))
+    # A JSON run logs each batch as it lands, so an interrupted one can
+    # --resume without re-sending it (see Checkpoint).
+    checkpoint = Checkpoint(args.resume) if service and FORMAT == "json" else None
+    finished = False
+    sizer = client.BatchSizer(args.batch_chars, args.batch_seconds, args.client_batch)
+    try:
+        with profiling.phase("translate.run"):
+            if FORMAT == "json":
+                run_json(
+                    base,
+                    FILE_TEMPLATE,
+                    langs,
+                    service,
+                    sizer,
+                    args.limit,
+                    args.inflight,
+                    tm,
+                    checkpoint,
+                )
+            else:
+                run_po(base, FILE_TEMPLATE, langs, service, sizer, args.limit, tm)
+        finished = True
+    finally:
+        if tm:
+            tm.close()
+        if checkpoint:
+            checkpoint.close(finished)
+    if sizer.batches:
+        print(sizer.summary(), flush=True)
+        profiling.count("translate.service_strings", sizer.strings)
+        profiling.count("translate.service_chars", sizer.chars)
+        profiling.count("translate.service_batches", sizer.batches)
 
     print("done.", flush=True)
 
     # Final gate: make an incomplete locale set a hard, loud failure.
     if args.fail_on_gaps:
-        enforce_no_gaps(base, FILE_TEMPLATE, langs, FORMAT)
+        with profiling.phase("translate.gap_scan"):
+            enforce_no_gaps(base, FILE_TEMPLATE, langs, FORMAT, args.jobs)
 
 
 if __name__ == "__main__":